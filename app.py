@@ -1,8 +1,9 @@
-from data.courier_types import CourierType
+from data.courier_types import CourierType, COURIER_TYPES, courier_type_registry
 from resources import courier_resource
 from resources import order_resource
+from resources import stats_resource
 from flask_restful import Api
-from data import db_session
+from data import db_session, metrics
 from os.path import exists
 from flask import Flask
 from os import mkdir
@@ -13,21 +14,29 @@ def add_courier_types():
     if sorted(type.title for type in session.query(CourierType).all()) != ['bike', 'car', 'foot']:
         session.query(CourierType).delete()
         session.commit()
-        types = ((1, 'foot', 10, 2), (2, 'bike', 15, 5), (3, 'car', 50, 9))
-        for id, title, carrying, coefficient in types:
+        for id, title, carrying, coefficient in COURIER_TYPES:
             type = CourierType(id=id, title=title, carrying=carrying, coefficient=coefficient)
             session.add(type)
         session.commit()
+    courier_type_registry.load(session)
 
 
 app = Flask(__name__)
+app.teardown_appcontext(db_session.close_session)
+metrics.init_app(app)
 api = Api(app)
 
 api.add_resource(courier_resource.CouriersResource, '/couriers/<string:courier_id>')
 api.add_resource(order_resource.OrderCompleteResource, '/orders/complete')
 api.add_resource(order_resource.OrdersAssignResource, '/orders/assign')
+api.add_resource(order_resource.OrdersAssignBatchResource, '/orders/assign/batch')
 api.add_resource(courier_resource.CouriersListResource, '/couriers')
 api.add_resource(order_resource.OrdersListResource, '/orders')
+api.add_resource(courier_resource.CouriersStreamResource, '/couriers/stream')
+api.add_resource(order_resource.OrdersStreamResource, '/orders/stream')
+api.add_resource(stats_resource.DatabaseStatsResource, '/stats/db')
+api.add_resource(stats_resource.CacheStatsResource, '/stats/cache')
+api.add_resource(stats_resource.MetricsResource, '/metrics')
 
 
 def main():
@@ -0,0 +1,112 @@
+from concurrent.futures import ThreadPoolExecutor
+from app import app, add_courier_types
+from data import db_session
+from os.path import exists
+from os import environ, mkdir
+import asyncio
+import sys
+import io
+
+MAX_WORKERS = 8
+
+
+class ReceiveStream(io.RawIOBase):
+    def __init__(self, receive, loop):
+        self.receive = receive
+        self.loop = loop
+        self.buffer = b''
+        self.finished = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.buffer and not self.finished:
+            message = asyncio.run_coroutine_threadsafe(self.receive(), self.loop).result()
+            self.buffer = message.get('body', b'')
+            self.finished = not message.get('more_body', False) or message['type'] != 'http.request'
+        size = min(len(buffer), len(self.buffer))
+        buffer[:size], self.buffer = self.buffer[:size], self.buffer[size:]
+        return size
+
+
+def build_environ(scope, stream):
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode().decode('latin-1'),
+        'PATH_INFO': scope['path'].encode().decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': (scope.get('server') or ('localhost', 80))[0],
+        'SERVER_PORT': str((scope.get('server') or ('localhost', 80))[1]),
+        'REMOTE_ADDR': (scope.get('client') or ('', 0))[0],
+        'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BufferedReader(stream),
+        'wsgi.input_terminated': True,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        name, value = name.decode('latin-1').upper().replace('-', '_'), value.decode('latin-1')
+        key = name if name in ('CONTENT_TYPE', 'CONTENT_LENGTH') else f'HTTP_{name}'
+        if key in environ:
+            value = environ[key] + ('; ' if key == 'HTTP_COOKIE' else ',') + value
+        environ[key] = value
+    return environ
+
+
+class AsgiApp:
+    def __init__(self, wsgi_app, max_workers=None):
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(max_workers or int(environ.get('ASGI_WORKERS', MAX_WORKERS)))
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    await asyncio.get_running_loop().run_in_executor(None, self.executor.shutdown, True)
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+        if scope['type'] != 'http':
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self.run, scope, receive, send, loop)
+
+    def run(self, scope, receive, send, loop):
+        def call(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['start'] = {'type': 'http.response.start', 'status': int(status.split(' ', 1)[0]),
+                                 'headers': [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                                             for name, value in headers]}
+
+        iterable = self.wsgi_app(build_environ(scope, ReceiveStream(receive, loop)), start_response)
+        try:
+            for chunk in iterable:
+                if chunk:
+                    if 'start' in response:
+                        call(response.pop('start'))
+                    call({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            if 'start' in response:
+                call(response.pop('start'))
+            call({'type': 'http.response.body', 'body': b''})
+        finally:
+            if hasattr(iterable, 'close'):
+                iterable.close()
+
+
+def create_app(db_file='db/base.db'):
+    if not exists('./db'):
+        mkdir('./db')
+    db_session.global_init(db_file)
+    add_courier_types()
+    return AsgiApp(app)
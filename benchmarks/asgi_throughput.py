@@ -0,0 +1,118 @@
+from multiprocessing import get_context
+from tempfile import TemporaryDirectory
+from .endpoints import write_jsonl
+from .generator import Generator, SIZES
+from time import perf_counter
+from os.path import join
+from os import environ
+import argparse
+import asyncio
+import logging
+import socket
+
+CONNECTIONS = (1, 16, 64)
+DURATION = 5
+WORKERS = 8
+
+
+def serve(mode, db_file, port, workers):
+    environ['COURIER_CACHE_SIZE'] = '1'
+    if mode == 'wsgi':
+        from app import app, add_courier_types
+        from data import db_session
+        from waitress import serve
+
+        logging.getLogger('waitress').setLevel(logging.ERROR)
+        db_session.global_init(db_file)
+        add_courier_types()
+        serve(app, host='127.0.0.1', port=port, threads=workers, connection_limit=1000, _quiet=True)
+    else:
+        from asgi import create_app
+        import uvicorn
+
+        uvicorn.run(create_app(db_file), host='127.0.0.1', port=port, log_level='warning',
+                    limit_concurrency=1000, backlog=1000)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def wait_server(port, timeout=30):
+    start = perf_counter()
+    while perf_counter() - start < timeout:
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise TimeoutError(port)
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    length = next(int(line.split(b':')[1]) for line in head.split(b'\r\n')
+                  if line.lower().startswith(b'content-length:'))
+    await reader.readexactly(length)
+    return int(head.split(b' ')[1])
+
+
+async def connection(port, courier_ids, offset, deadline, counts):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    index = offset
+    while perf_counter() < deadline:
+        writer.write(b'GET /couriers/%d HTTP/1.1\r\nHost: localhost\r\n\r\n' % courier_ids[index % len(courier_ids)])
+        status = await read_response(reader)
+        counts[status] = counts.get(status, 0) + 1
+        index += 1
+    writer.close()
+
+
+async def load(port, connections, courier_ids, duration):
+    await wait_server(port)
+    counts = {}
+    deadline = perf_counter() + duration
+    await asyncio.gather(*(connection(port, courier_ids, offset * 7919, deadline, counts)
+                           for offset in range(connections)))
+    return counts
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Сравнение пропускной способности WSGI и ASGI режимов')
+    parser.add_argument('--size', choices=list(SIZES), default='10k')
+    parser.add_argument('--connections', type=int, nargs='+', default=list(CONNECTIONS))
+    parser.add_argument('--duration', type=float, default=DURATION)
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    args = parser.parse_args(args)
+
+    from bulk_load import load as bulk_load
+
+    generator = Generator(SIZES[args.size])
+    courier_ids = list(range(1, generator.couriers_count + 1))
+    with TemporaryDirectory() as directory:
+        db_file = join(directory, 'bench.db')
+        for kind, items in (('couriers', generator.couriers()), ('orders', generator.orders())):
+            write_jsonl(join(directory, f'{kind}.jsonl'), items)
+            bulk_load(db_file, kind, join(directory, f'{kind}.jsonl'))
+
+        print(f'{args.size} orders, GET /couriers/<id>, {args.workers} workers')
+        for mode in ('wsgi', 'asgi'):
+            port = free_port()
+            server = get_context('spawn').Process(target=serve, args=(mode, db_file, port, args.workers))
+            server.start()
+            try:
+                for connections in args.connections:
+                    counts = asyncio.run(load(port, connections, courier_ids, args.duration))
+                    errors = sum(count for status, count in counts.items() if status != 200)
+                    print(f'  {mode} {connections} connections: {sum(counts.values()) / args.duration:.0f} '
+                          f'requests/s, {errors} errors')
+            finally:
+                server.terminate()
+                server.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+from resources.order_index import order_index
+from data.db_session import SqlAlchemyBase
+from tempfile import TemporaryDirectory
+from random import Random
+from data import db_session
+from time import perf_counter
+from os.path import join
+from app import app, add_courier_types
+
+
+def fill(client, couriers_count, orders_count, seed=0):
+    random = Random(seed)
+    hours = ['08:00-12:00', '12:00-16:00', '16:00-20:00', '09:00-18:00']
+    client.post('/couriers', json={'data': [
+        {'courier_id': id, 'courier_type': random.choice(['foot', 'bike', 'car']),
+         'regions': random.sample(range(1, 101), 3), 'working_hours': random.sample(hours, 2)}
+        for id in range(1, couriers_count + 1)]})
+    client.post('/orders', json={'data': [
+        {'order_id': id, 'weight': random.randint(1, 1000) / 100, 'region': random.randint(1, 100),
+         'delivery_hours': random.sample(hours, 1)} for id in range(1, orders_count + 1)]})
+
+
+def reset(engine):
+    SqlAlchemyBase.metadata.drop_all(engine)
+    SqlAlchemyBase.metadata.create_all(engine)
+    order_index.reset()
+    add_courier_types()
+
+
+def main(couriers_count=1000, orders_count=20000):
+    with TemporaryDirectory() as directory:
+        engine = db_session.global_init(join(directory, 'bench.db'))
+        client = app.test_client()
+
+        reset(engine)
+        fill(client, couriers_count, orders_count)
+        start = perf_counter()
+        single = sum(len(client.post('/orders/assign', json={'courier_id': id}).json['orders'])
+                     for id in range(1, couriers_count + 1))
+        single_time = perf_counter() - start
+
+        reset(engine)
+        fill(client, couriers_count, orders_count)
+        start = perf_counter()
+        batch = sum(len(courier['orders']) for courier in client.post('/orders/assign/batch', json={}).json['couriers'])
+        batch_time = perf_counter() - start
+
+    print(f'{couriers_count} couriers, {orders_count} orders')
+    print(f'one by one: {single} orders in {single_time:.2f} s')
+    print(f'batch: {batch} orders in {batch_time:.2f} s, x{single_time / batch_time:.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+from multiprocessing import get_context
+from tempfile import TemporaryDirectory
+from .assign_batch import fill
+from time import perf_counter
+from os.path import join
+
+
+def populate(db_file, couriers_count, orders_count, seed=0):
+    from app import app, add_courier_types
+    from data import db_session
+
+    db_session.global_init(db_file)
+    add_courier_types()
+    fill(app.test_client(), couriers_count, orders_count, seed)
+
+
+def assign(db_file, courier_ids):
+    from app import app
+    from data import db_session
+
+    db_session.global_init(db_file)
+    client = app.test_client()
+    return [(courier_id, [order['id'] for order in
+                          client.post('/orders/assign', json={'courier_id': courier_id}).json['orders']])
+            for courier_id in courier_ids]
+
+
+def run(db_file, couriers_count, workers):
+    with get_context('spawn').Pool(workers) as pool:
+        return [result for results in pool.starmap(
+            assign, [(db_file, range(worker + 1, couriers_count + 1, workers)) for worker in range(workers)])
+            for result in results]
+
+
+def main(couriers_count=1000, orders_count=20000, workers_counts=(1, 2, 4, 8)):
+    print(f'{couriers_count} couriers, {orders_count} orders')
+    for workers in workers_counts:
+        with TemporaryDirectory() as directory:
+            db_file = join(directory, 'bench.db')
+            with get_context('spawn').Pool(1) as pool:
+                pool.apply(populate, (db_file, couriers_count, orders_count))
+            start = perf_counter()
+            results = run(db_file, couriers_count, workers)
+            seconds = perf_counter() - start
+        assigned = sum(len(orders) for _, orders in results)
+        print(f'{workers} workers: {assigned} orders in {seconds:.2f} s, '
+              f'{couriers_count / seconds:.0f} assignments/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+from data.availability import working_bitmap, delivery_bitmap, check_bitmaps
+from data.time_intervals import parse_interval
+from types import SimpleNamespace
+from timeit import timeit
+
+
+def interval(value):
+    time_start, time_end = parse_interval(value)
+    return SimpleNamespace(time_start=time_start, time_end=time_end)
+
+
+def merge_intervals(intervals):
+    merged = []
+    for time_start, time_end in sorted(intervals):
+        if time_start > time_end:
+            continue
+        if merged and time_start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], time_end)
+        else:
+            merged.append([time_start, time_end])
+    return merged
+
+
+def check_intervals(order_intervals, courier_intervals):
+    order_intervals = merge_intervals((interval.time_start - 1, interval.time_end - 1) for interval in order_intervals)
+    courier_intervals = merge_intervals((interval.time_start, interval.time_end) for interval in courier_intervals)
+    i = j = 0
+    while i < len(order_intervals) and j < len(courier_intervals):
+        (order_start, order_end), (courier_start, courier_end) = order_intervals[i], courier_intervals[j]
+        if max(order_start, courier_start) <= min(order_end, courier_end):
+            return True
+        if order_end < courier_end:
+            i += 1
+        else:
+            j += 1
+    return False
+
+
+def set_check_intervals(order_intervals, courier_intervals):
+    for courier_interval in courier_intervals:
+        for order_interval in order_intervals:
+            if set(range(courier_interval.time_start, courier_interval.time_end + 1)) & \
+                    set(range(order_interval.time_start - 1, order_interval.time_end)):
+                return True
+    return False
+
+
+def main(number=20000):
+    cases = {
+        'overlap': ([interval('09:00-18:00')], [interval('11:35-14:05'), interval('09:00-11:00')]),
+        'no overlap': ([interval('09:00-12:00'), interval('16:00-21:30')], [interval('21:35-23:59')]),
+    }
+    for name, (order_intervals, courier_intervals) in cases.items():
+        old = timeit(lambda: set_check_intervals(order_intervals, courier_intervals), number=number)
+        new = timeit(lambda: check_intervals(order_intervals, courier_intervals), number=number)
+        working = working_bitmap((interval.time_start, interval.time_end) for interval in courier_intervals)
+        delivery = delivery_bitmap((interval.time_start, interval.time_end) for interval in order_intervals)
+        bitmap = timeit(lambda: check_bitmaps(working, delivery), number=number)
+        print(f'{name}: set intersection {old / number * 1e6:.2f} us, sweep {new / number * 1e6:.2f} us, '
+              f'bitmap {bitmap / number * 1e6:.2f} us, x{old / new:.1f} / x{old / bitmap:.1f}')
+
+
+if __name__ == '__main__':
+    main()
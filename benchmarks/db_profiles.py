@@ -0,0 +1,36 @@
+from data.db_session import create_engine, SqlAlchemyBase, PROFILES
+from tempfile import TemporaryDirectory
+from data.__all_models import orders
+from time import perf_counter
+from os.path import join
+import sqlalchemy as sa
+
+
+def write_throughput(engine, commits, batch_size):
+    SqlAlchemyBase.metadata.create_all(engine)
+    insert = orders.Order.__table__.insert()
+    start = perf_counter()
+    for order_id in range(1, commits + 1):
+        with engine.begin() as connection:
+            connection.execute(insert, {'order_id': order_id, 'weight': 1, 'region': 1, 'is_complete': False})
+    single = commits / (perf_counter() - start)
+    start = perf_counter()
+    with engine.begin() as connection:
+        connection.execute(insert, [{'order_id': order_id, 'weight': 1, 'region': 1, 'is_complete': False}
+                                    for order_id in range(commits + 1, commits + batch_size + 1)])
+    batch = batch_size / (perf_counter() - start)
+    engine.dispose()
+    return single, batch
+
+
+def main(commits=2000, batch_size=100000):
+    with TemporaryDirectory() as directory:
+        engines = {'rollback journal': sa.create_engine(f'sqlite:///{join(directory, "default.db")}')}
+        engines.update({name: create_engine(join(directory, f'{name}.db'), name) for name in PROFILES})
+        for name, engine in engines.items():
+            single, batch = write_throughput(engine, commits, batch_size)
+            print(f'{name}: {single:.0f} commits/s, {batch:.0f} rows/s in one transaction')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+from multiprocessing import get_context
+from tempfile import TemporaryDirectory
+from .generator import Generator, SIZES
+from datetime import datetime
+from time import perf_counter
+from os.path import join, dirname, exists
+from sqlalchemy import event
+import argparse
+import json
+import sys
+
+BASELINES = join(dirname(__file__), 'baselines.json')
+THRESHOLD = 1.5
+REQUESTS = 200
+
+
+def percentile(samples, percent):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * percent / 100))]
+
+
+def write_jsonl(path, items):
+    with open(path, 'w') as file:
+        for item in items:
+            file.write(json.dumps(item) + '\n')
+
+
+def ndjson(items):
+    return ''.join(json.dumps(item) + '\n' for item in items)
+
+
+def cases(generator, requests):
+    couriers_count, orders_count = generator.couriers_count, generator.orders_count
+    assigned = {}
+    ids = {'courier': couriers_count, 'order': orders_count}
+
+    def new_ids(kind, count):
+        ids[kind] += count
+        return ids[kind] - count + 1
+
+    def assign(client, i):
+        rv = client.post('/orders/assign', json={'courier_id': i + 1})
+        assigned[i + 1] = [order['id'] for order in rv.json['orders']]
+        return rv
+
+    def complete(client, i):
+        courier_id = next((id for id, orders in assigned.items() if orders), 1)
+        order_id = assigned[courier_id].pop() if assigned.get(courier_id) else 1
+        return client.post('/orders/complete', json={
+            'courier_id': courier_id, 'order_id': order_id,
+            'complete_time': datetime.now().strftime('%Y-%m-%dT%H:%M:%S.%fZ')})
+
+    return [
+        ('POST /couriers', requests, lambda client, i: client.post('/couriers', json={
+            'data': list(generator.couriers(new_ids('courier', 10), 10))})),
+        ('POST /orders', requests, lambda client, i: client.post('/orders', json={
+            'data': list(generator.orders(new_ids('order', 10), 10))})),
+        ('POST /couriers/stream', requests // 10, lambda client, i: client.post(
+            '/couriers/stream', data=ndjson(generator.couriers(new_ids('courier', 100), 100)))),
+        ('POST /orders/stream', requests // 10, lambda client, i: client.post(
+            '/orders/stream', data=ndjson(generator.orders(new_ids('order', 100), 100)))),
+        ('POST /orders/assign', min(requests, couriers_count), assign),
+        ('POST /orders/complete', requests, complete),
+        ('PATCH /couriers/<id>', min(requests, couriers_count), lambda client, i: client.patch(
+            f'/couriers/{i + 1}', json={'working_hours': generator.windows(2, 120, 600)})),
+        ('GET /couriers/<id>', min(requests, couriers_count), lambda client, i: client.get(
+            f'/couriers/{couriers_count - i}')),
+        ('GET /couriers/<id> cached', min(requests, couriers_count), lambda client, i: client.get(
+            f'/couriers/{couriers_count - i}')),
+        ('POST /orders/assign/batch', requests // 10, lambda client, i: client.post('/orders/assign/batch', json={
+            'courier_ids': list(range(couriers_count - 20 * (i + 1) + 1, couriers_count - 20 * i + 1))})),
+    ]
+
+
+def run(size, requests=REQUESTS, seed=0):
+    from bulk_load import load
+    from data import db_session
+    from app import app
+
+    generator = Generator(SIZES[size], seed)
+    with TemporaryDirectory() as directory:
+        db_file = join(directory, 'bench.db')
+        for kind, items in (('couriers', generator.couriers()), ('orders', generator.orders())):
+            write_jsonl(join(directory, f'{kind}.jsonl'), items)
+            load(db_file, kind, join(directory, f'{kind}.jsonl'))
+
+        engine = db_session.global_init(db_file)
+        client = app.test_client()
+        queries = []
+        for listened in (engine, db_session.get_engine(read_only=True)):
+            event.listen(listened, 'before_cursor_execute', lambda *args: queries.append(1))
+        results = {}
+        for name, count, request in cases(generator, requests):
+            samples = []
+            queries.clear()
+            for i in range(count):
+                start = perf_counter()
+                rv = request(client, i)
+                rv.get_data()
+                rv.close()
+                samples.append((perf_counter() - start) * 1000)
+                assert rv.status_code < 500, (name, rv.status_code)
+            results[name] = {'p50': percentile(samples, 50), 'p95': percentile(samples, 95),
+                             'p99': percentile(samples, 99), 'queries': len(queries) / max(count, 1)}
+        engine.dispose()
+    return results
+
+
+def compare(size, results, baselines, threshold):
+    failures = []
+    for name, result in results.items():
+        baseline = baselines.get(size, {}).get(name)
+        if not baseline:
+            continue
+        if result['p50'] > baseline['p50'] * threshold:
+            failures.append(f'{size} {name}: p50 {result["p50"]:.2f} ms > {baseline["p50"]:.2f} ms x{threshold}')
+        if result['queries'] > baseline['queries'] + 1e-9:
+            failures.append(f'{size} {name}: {result["queries"]:.1f} queries > {baseline["queries"]:.1f}')
+    return failures
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Бенчмарк всех эндпоинтов на синтетических данных')
+    parser.add_argument('--size', nargs='+', choices=list(SIZES), default=['10k'])
+    parser.add_argument('--requests', type=int, default=REQUESTS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args(args)
+
+    baselines = {}
+    if exists(BASELINES):
+        with open(BASELINES) as file:
+            baselines = json.load(file)
+    failures = []
+    for size in args.size:
+        with get_context('spawn').Pool(1) as pool:
+            results = pool.apply(run, (size, args.requests, args.seed))
+        print(f'{size} orders')
+        for name, result in results.items():
+            print(f'  {name}: p50 {result["p50"]:.2f} ms, p95 {result["p95"]:.2f} ms, p99 {result["p99"]:.2f} ms, '
+                  f'{result["queries"]:.1f} queries/request')
+        failures.extend(compare(size, results, baselines, args.threshold))
+        if args.save_baseline:
+            baselines[size] = results
+
+    if args.save_baseline:
+        with open(BASELINES, 'w') as file:
+            json.dump(baselines, file, indent=2, sort_keys=True)
+    for failure in failures:
+        print('REGRESSION ' + failure)
+    return 1 if failures and not args.save_baseline else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
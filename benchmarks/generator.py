@@ -0,0 +1,49 @@
+from data.time_intervals import format_interval
+from itertools import accumulate
+from random import Random
+
+SIZES = {'10k': 10000, '100k': 100000, '1m': 1000000}
+COURIER_TYPES = (('foot', 0.5), ('bike', 0.3), ('car', 0.2))
+SHIFTS = ((8 * 60, 12 * 60), (9 * 60, 18 * 60), (12 * 60, 16 * 60), (16 * 60, 22 * 60), (10 * 60, 14 * 60))
+
+
+class Generator:
+    def __init__(self, orders_count, seed=0):
+        self.random = Random(seed)
+        self.orders_count = orders_count
+        self.couriers_count = max(orders_count // 10, 1)
+        self.regions_count = max(orders_count // 100, 10)
+        self.region_weights = list(accumulate(1 / number for number in range(1, self.regions_count + 1)))
+
+    def regions(self, count):
+        return sorted(set(self.random.choices(range(1, self.regions_count + 1), cum_weights=self.region_weights,
+                                              k=count)))
+
+    def windows(self, count, min_length, max_length):
+        windows = []
+        for _ in range(count):
+            if self.random.random() < 0.7:
+                time_start, time_end = self.random.choice(SHIFTS)
+            else:
+                time_start = self.random.randrange(6 * 60, 22 * 60, 5)
+                time_end = min(time_start + self.random.randrange(min_length, max_length, 5), 24 * 60 - 1)
+            windows.append(format_interval(time_start, time_end))
+        return windows
+
+    def courier(self, courier_id):
+        return {'courier_id': courier_id,
+                'courier_type': self.random.choices([title for title, _ in COURIER_TYPES],
+                                                    [weight for _, weight in COURIER_TYPES])[0],
+                'regions': self.regions(self.random.randint(1, 5)),
+                'working_hours': self.windows(self.random.randint(1, 3), 120, 600)}
+
+    def order(self, order_id):
+        weight = min(max(round(self.random.lognormvariate(0, 1.2), 2), 0.01), 50)
+        return {'order_id': order_id, 'weight': weight, 'region': self.regions(1)[0],
+                'delivery_hours': self.windows(self.random.choices([1, 2, 3], [0.6, 0.3, 0.1])[0], 30, 240)}
+
+    def couriers(self, first_id=1, count=None):
+        return (self.courier(courier_id) for courier_id in range(first_id, first_id + (count or self.couriers_count)))
+
+    def orders(self, first_id=1, count=None):
+        return (self.order(order_id) for order_id in range(first_id, first_id + (count or self.orders_count)))
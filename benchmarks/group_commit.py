@@ -0,0 +1,62 @@
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import get_context
+from tempfile import TemporaryDirectory
+from .endpoints import write_jsonl
+from .generator import Generator, SIZES
+from datetime import datetime
+from time import perf_counter
+from os.path import join
+import argparse
+
+THREADS = 32
+REQUESTS = 2000
+
+
+def run(size, threads, requests, group_commit, seed=0):
+    from resources.complete_orders import completion_queue
+    from bulk_load import load
+    from data import db_session
+    from app import app
+
+    completion_queue.enabled = group_commit
+    generator = Generator(SIZES[size], seed)
+    with TemporaryDirectory() as directory:
+        db_file = join(directory, 'bench.db')
+        for kind, items in (('couriers', generator.couriers()), ('orders', generator.orders())):
+            write_jsonl(join(directory, f'{kind}.jsonl'), items)
+            load(db_file, kind, join(directory, f'{kind}.jsonl'))
+        engine = db_session.global_init(db_file)
+        couriers = app.test_client().post('/orders/assign/batch', json={}).json['couriers']
+        completions = [(courier['id'], order['id']) for courier in couriers for order in courier['orders']][:requests]
+        complete_time = datetime.now().strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+        def complete(ids):
+            with app.test_client() as client:
+                return client.post('/orders/complete', json={
+                    'courier_id': ids[0], 'order_id': ids[1], 'complete_time': complete_time}).status_code
+
+        start = perf_counter()
+        with ThreadPoolExecutor(threads) as executor:
+            statuses = list(executor.map(complete, completions))
+        seconds = perf_counter() - start
+        engine.dispose()
+    return len(completions), sum(status != 200 for status in statuses), seconds
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Сравнение POST /orders/complete с групповым коммитом и без него')
+    parser.add_argument('--size', choices=list(SIZES), default='10k')
+    parser.add_argument('--threads', type=int, default=THREADS)
+    parser.add_argument('--requests', type=int, default=REQUESTS)
+    args = parser.parse_args(args)
+
+    print(f'{args.size} orders, {args.threads} threads')
+    for group_commit in (False, True):
+        with get_context('spawn').Pool(1) as pool:
+            count, errors, seconds = pool.apply(run, (args.size, args.threads, args.requests, group_commit))
+        print(f'  {"group commit" if group_commit else "commit per request"}: {count} completions in '
+              f'{seconds:.2f} s, {count / seconds:.0f} completions/s, {errors} errors')
+
+
+if __name__ == '__main__':
+    main()
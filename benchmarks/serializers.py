@@ -0,0 +1,44 @@
+from resources.serializers import ids_response, courier_profile, assign_result, batch_assign_result, \
+    validation_error_response
+from data.time_intervals import format_interval
+from datetime import datetime
+from timeit import timeit
+from flask import jsonify
+from app import app
+
+SHAPES = {
+    'courier profile': (
+        lambda: jsonify({'courier_id': 1, 'courier_type': 'foot', 'earnings': 1000, 'rating': 4.5,
+                         'regions': list(range(20)),
+                         'working_hours': [format_interval(60 * i, 60 * i + 30) for i in range(10)]}).get_data(),
+        lambda: courier_profile(1, 'foot', list(range(20)), [(60 * i, 60 * i + 30) for i in range(10)], 1000, 4.5)),
+    'id list 100k': (
+        lambda: jsonify({'orders': [{'id': id} for id in range(100000)]}).get_data(),
+        lambda: ids_response('orders', list(range(100000)), 201).get_data()),
+    'validation error 1k': (
+        lambda: jsonify({'validation_error': {'orders': [{'id': id} for id in range(1000)]}}).get_data(),
+        lambda: validation_error_response('orders', list(range(1000))).get_data()),
+    'assign result': (
+        lambda: jsonify({'orders': [{'id': id} for id in range(50)],
+                         'assign_time': datetime.now().strftime('%Y-%m-%dT%H:%M:%S.%fZ')}).get_data(),
+        lambda: assign_result(list(range(50)), datetime.now())),
+    'batch assign 1k couriers': (
+        lambda: jsonify({'couriers': [{'id': id, 'orders': [{'id': id * 10 + i} for i in range(5)],
+                                       'assign_time': datetime.now().strftime('%Y-%m-%dT%H:%M:%S.%fZ')}
+                                      for id in range(1000)]}).get_data(),
+        lambda: batch_assign_result([(id, [id * 10 + i for i in range(5)]) for id in range(1000)], datetime.now())),
+}
+
+
+def main(seconds=1):
+    with app.app_context():
+        for name, (old, new) in SHAPES.items():
+            number = max(1, int(seconds / timeit(old, number=1)))
+            old_time = timeit(old, number=number) / number
+            new_time = timeit(new, number=number) / number
+            print(f'{name}: jsonify {old_time * 1e6:.0f} us, serializer {new_time * 1e6:.0f} us, '
+                  f'x{old_time / new_time:.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+from resources.bulk_insert import COURIER_TABLES, ORDER_TABLES, courier_rows, order_rows
+from data.courier_types import CourierType, COURIER_TYPES
+from data.migrations import INDEXES, create_indexes
+from data.db_session import SqlAlchemyBase
+from collections import Counter
+from data.couriers import Courier
+from data.delivery import Delivery
+from data.orders import Order
+from data import db_session, migrations, __all_models  # noqa: F401
+from sqlalchemy import orm
+from time import perf_counter
+import argparse
+import json
+import sys
+
+BATCH_SIZE = 50000
+KINDS = {
+    'couriers': (['courier_id', 'courier_type', 'working_hours', 'regions'], [Courier.courier_id, Delivery.id],
+                 COURIER_TABLES),
+    'orders': (['order_id', 'weight', 'region', 'delivery_hours'], [Order.order_id], ORDER_TABLES),
+}
+
+
+def read_items(path):
+    with open(path) as file:
+        if path.endswith('.jsonl'):
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            data = json.load(file)
+            yield from data['data'] if isinstance(data, dict) else data
+
+
+def read_batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def validate_batch(kind, batch, types, existing_ids):
+    keys, columns, tables = KINDS[kind]
+    make_rows = order_rows if kind == 'orders' else lambda courier_data: courier_rows(courier_data, types)
+    counter = Counter(item.get(keys[0]) for item in batch
+                      if isinstance(item, dict) and isinstance(item.get(keys[0]), int))
+    wrong_ids = {id for id, count in counter.items() if count > 1 or id in existing_ids}
+    rows = tuple([] for _ in tables)
+    rejected = []
+    for item in batch:
+        try:
+            assert all(key in item for key in keys) and len(item) == len(keys) and item[keys[0]] not in wrong_ids
+            for table_rows, new_rows in zip(rows, make_rows(item)):
+                table_rows.extend(new_rows)
+        except Exception:
+            rejected.append(item.get(keys[0]) if isinstance(item, dict) else None)
+    return rows, rejected
+
+
+def insert_rows(session, tables, rows):
+    connection = session.connection()
+    cursor = connection.connection.cursor()
+    for table, table_rows in zip(tables, rows):
+        if not table_rows:
+            continue
+        columns = list(table_rows[0])
+        processors = [table.c[column].type.bind_processor(connection.dialect) for column in columns]
+        cursor.executemany(f'INSERT INTO {table.name} ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})',
+                           [tuple(value if processor is None else processor(value)
+                                  for processor, value in zip(processors, map(row.get, columns)))
+                            for row in table_rows])
+    session.commit()
+
+
+def add_courier_types(session):
+    if not session.query(CourierType).count():
+        session.execute(CourierType.__table__.insert(), [
+            {'id': id, 'title': title, 'carrying': carrying, 'coefficient': coefficient}
+            for id, title, carrying, coefficient in COURIER_TYPES])
+        session.commit()
+    return {title: id for id, title in session.query(CourierType.id, CourierType.title)}
+
+
+def load(db_file, kind, path, batch_size=BATCH_SIZE):
+    engine = db_session.create_engine(db_file, 'bulk')
+    migrations.migrate(engine, SqlAlchemyBase.metadata)
+    session = orm.sessionmaker(bind=engine)()
+    types = add_courier_types(session)
+    for name, _, _ in INDEXES:
+        session.execute(f'DROP INDEX IF EXISTS {name}')
+    session.commit()
+
+    start, loaded, rejected = perf_counter(), 0, []
+    existing_ids = {id for column in KINDS[kind][1] for id, in session.query(column)}
+    try:
+        for batch in read_batches(read_items(path), batch_size):
+            rows, batch_rejected = validate_batch(kind, batch, types, existing_ids)
+            insert_rows(session, KINDS[kind][2], rows)
+            existing_ids.update(row[KINDS[kind][0][0]] for row in rows[1 if kind == 'couriers' else 0])
+            loaded += len(rows[0])
+            rejected.extend(batch_rejected)
+            print(f'{kind}: {loaded} loaded, {loaded / (perf_counter() - start):.0f} rows/s', file=sys.stderr)
+    finally:
+        session.close()
+        with engine.begin() as connection:
+            create_indexes(connection)
+        with engine.connect() as connection:
+            connection.execute('PRAGMA journal_mode = WAL')
+        engine.dispose()
+    return loaded, rejected, perf_counter() - start
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Загрузка курьеров и заказов в базу данных без HTTP')
+    parser.add_argument('kind', choices=list(KINDS))
+    parser.add_argument('path', help='JSON ({"data": [...]}) или JSONL файл')
+    parser.add_argument('--db', default='db/base.db')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    args = parser.parse_args(args)
+
+    loaded, rejected, seconds = load(args.db, args.kind, args.path, args.batch_size)
+    print(f'{args.kind}: {loaded} rows loaded in {seconds:.2f} s, {loaded / max(seconds, 1e-9):.0f} rows/s, '
+          f'{len(rejected)} rejected')
+    if rejected:
+        print('rejected ids: ' + json.dumps(rejected[:100]), file=sys.stderr)
+    return 1 if rejected else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
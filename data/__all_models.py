@@ -1 +1,2 @@
-from . import couriers, orders, time_courier_intervals, time_order_intervals, courier_types, regions, delivery
+from . import couriers, orders, time_courier_intervals, time_order_intervals, courier_types, regions, delivery, \
+    order_log
@@ -0,0 +1,47 @@
+from sqlalchemy.types import TypeDecorator, LargeBinary
+
+MINUTES_IN_DAY = 24 * 60
+BITMAP_SIZE = MINUTES_IN_DAY // 8
+
+
+class Bitmap(TypeDecorator):
+    impl = LargeBinary
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else value.to_bytes(BITMAP_SIZE, 'big')
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else int.from_bytes(value, 'big')
+
+
+def minutes_bitmap(intervals):
+    bitmap = 0
+    for time_start, time_end in intervals:
+        time_start = max(time_start, 0)
+        if time_start <= time_end:
+            bitmap |= ((1 << (time_end - time_start + 1)) - 1) << time_start
+    return bitmap
+
+
+def working_bitmap(intervals):
+    return minutes_bitmap(intervals)
+
+
+def delivery_bitmap(intervals):
+    return minutes_bitmap((time_start - 1, time_end - 1) for time_start, time_end in intervals)
+
+
+def check_bitmaps(working, delivery):
+    return working & delivery != 0
+
+
+def courier_bitmap(courier):
+    if courier.working_bitmap is None:
+        return working_bitmap((interval.time_start, interval.time_end) for interval in courier.working_hours_orm)
+    return courier.working_bitmap
+
+
+def order_bitmap(order):
+    if order.delivery_bitmap is None:
+        return delivery_bitmap((interval.time_start, interval.time_end) for interval in order.delivery_hours_orm)
+    return order.delivery_bitmap
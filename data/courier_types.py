@@ -1,11 +1,16 @@
 import sqlalchemy
-from sqlalchemy import orm
-from sqlalchemy_serializer import SerializerMixin
-from sqlalchemy.orm import validates
+from sqlalchemy import orm, event
+from sqlalchemy.orm import validates, object_session
 from .db_session import SqlAlchemyBase, create_session
+from collections import namedtuple
+from types import MappingProxyType
+from threading import Lock
 
+COURIER_TYPES = ((1, 'foot', 10, 2), (2, 'bike', 15, 5), (3, 'car', 50, 9))
+CourierTypeInfo = namedtuple('CourierTypeInfo', ['id', 'title', 'carrying', 'coefficient'])
 
-class CourierType(SqlAlchemyBase, SerializerMixin):
+
+class CourierType(SqlAlchemyBase):
     __tablename__ = 'courier_types'
 
     id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True, autoincrement=True)
@@ -37,3 +42,62 @@ class CourierType(SqlAlchemyBase, SerializerMixin):
     def validate_coefficient(self, key, value):
         assert isinstance(value, int)
         return value
+
+
+class CourierTypeRegistry:
+    def __init__(self):
+        self.lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.types = None
+            self.titles = None
+
+    def load(self, session=None):
+        with self.lock:
+            if self.types is None:
+                session = session or create_session()
+                with session.no_autoflush:
+                    types = [CourierTypeInfo(*row) for row in session.query(
+                        CourierType.id, CourierType.title, CourierType.carrying, CourierType.coefficient)]
+                self.types = MappingProxyType({courier_type.id: courier_type for courier_type in types})
+                self.titles = MappingProxyType({courier_type.title: courier_type for courier_type in types})
+            return self.types, self.titles
+
+    def get(self, id):
+        return self.load()[0][id]
+
+    def get_by_title(self, title):
+        return self.load()[1].get(title)
+
+    def get_ids(self):
+        return {title: courier_type.id for title, courier_type in self.load()[1].items()}
+
+
+courier_type_registry = CourierTypeRegistry()
+
+
+@event.listens_for(CourierType, 'after_insert')
+@event.listens_for(CourierType, 'after_update')
+@event.listens_for(CourierType, 'after_delete')
+def mark_changed(mapper, connection, target):
+    object_session(target).info['courier_types_changed'] = True
+
+
+@event.listens_for(orm.Session, 'after_bulk_update')
+@event.listens_for(orm.Session, 'after_bulk_delete')
+def mark_bulk_changed(context):
+    if context.mapper.class_ is CourierType:
+        context.session.info['courier_types_changed'] = True
+
+
+@event.listens_for(orm.Session, 'after_commit')
+def refresh_registry(session):
+    if session.info.pop('courier_types_changed', False):
+        courier_type_registry.reset()
+
+
+@event.listens_for(orm.Session, 'after_rollback')
+def discard_changes(session):
+    session.info.pop('courier_types_changed', None)
@@ -1,11 +1,11 @@
 from sqlalchemy import orm, Column, Integer, Float, ForeignKey
-from sqlalchemy_serializer import SerializerMixin
 from sqlalchemy.orm import validates
-from .db_session import SqlAlchemyBase, create_session
-from .courier_types import CourierType
+from .db_session import SqlAlchemyBase
+from .courier_types import courier_type_registry
+from .availability import Bitmap
 
 
-class Courier(SqlAlchemyBase, SerializerMixin):
+class Courier(SqlAlchemyBase):
     __tablename__ = 'couriers'
 
     courier_id = Column(Integer, primary_key=True, autoincrement=True)
@@ -13,6 +13,10 @@ class Courier(SqlAlchemyBase, SerializerMixin):
     sum_weight = Column(Float, default=0)
     earnings = Column(Integer, default=0)
     delivery_now = Column(Integer, ForeignKey('delivery.id'))
+    working_bitmap = Column(Bitmap)
+    min_delivery_time = Column(Float)
+    rating = Column(Float)
+    version = Column(Integer, default=0, server_default='0', nullable=False)
 
     courier_type_orm = orm.relation('CourierType')
     delivery_orm = orm.relation('Delivery')
@@ -22,17 +26,14 @@ class Courier(SqlAlchemyBase, SerializerMixin):
 
     @validates('courier_id')
     def validate_courier_id(self, key, value):
-        session = create_session()
-        ids = [courier.courier_id for courier in session.query(Courier).all()]
-        assert value not in ids and isinstance(value, int)
+        assert isinstance(value, int)
         return value
 
     @validates('courier_type')
     def validate_courier_type(self, key, value):
-        session = create_session()
-        types = {courier_type.title: courier_type.id for courier_type in session.query(CourierType).all()}
-        assert isinstance(value, str) and value in types
-        return types[value]
+        courier_type = courier_type_registry.get_by_title(value) if isinstance(value, str) else None
+        assert courier_type is not None
+        return courier_type.id
 
     @validates('sum_weight')
     def validate_sum_weight(self, key, value):
@@ -44,6 +45,11 @@ class Courier(SqlAlchemyBase, SerializerMixin):
         assert isinstance(value, int)
         return value
 
+    @validates('min_delivery_time', 'rating')
+    def validate_rating(self, key, value):
+        assert isinstance(value, (int, float)) or value is None
+        return value
+
     @validates('delivery_now')
     def validate_delivery_now(self, key, value):
         assert isinstance(value, int)
@@ -1,35 +1,265 @@
 import sqlalchemy as sa
 import sqlalchemy.orm as orm
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
 import sqlalchemy.ext.declarative as dec
+from flask import g, has_app_context, has_request_context, request
+from .migrations import migrate
+from .availability import Bitmap
+from . import metrics
+from time import perf_counter
+from collections import defaultdict
+from threading import Lock
+from os import environ
+import sqlite3
+import json
 
 SqlAlchemyBase = dec.declarative_base()
 
+PROFILES = {
+    'durable': {'journal_mode': 'WAL', 'synchronous': 'FULL', 'cache_size': -16000, 'mmap_size': 0,
+                'busy_timeout': 5000, 'temp_store': 'DEFAULT'},
+    'fast': {'journal_mode': 'WAL', 'synchronous': 'NORMAL', 'cache_size': -64000, 'mmap_size': 268435456,
+             'busy_timeout': 5000, 'temp_store': 'MEMORY'},
+    'bulk': {'journal_mode': 'MEMORY', 'synchronous': 'OFF', 'cache_size': -256000, 'mmap_size': 268435456,
+             'busy_timeout': 5000, 'temp_store': 'MEMORY'},
+}
+POOL = {'pool_size': 5, 'max_overflow': 10, 'pool_timeout': 30}
+READ_POOL = {'pool_size': 10, 'max_overflow': 20, 'pool_timeout': 30}
+READ_METHODS = ('GET', 'HEAD')
+PARTITION_CHUNK = 500
+SQLITE_VERSION = (3, 35, 0)
+
 __factory = None
 __engine = None
+__read_factory = None
+__read_engine = None
+__partitions = 0
+__partition_tables = []
+
+
+class PoolMetrics:
+    def __init__(self):
+        self.lock = Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.wait_time = 0
+        self.max_wait_time = 0
+        self.sessions = 0
+        self.open_sessions = 0
+
+    def add(self, **values):
+        with self.lock:
+            for key, value in values.items():
+                setattr(self, key, getattr(self, key) + value)
+
+    def wait(self, seconds):
+        with self.lock:
+            self.checkouts += 1
+            self.wait_time += seconds
+            self.max_wait_time = max(self.max_wait_time, seconds)
+
+
+class MeasuredQueuePool(QueuePool):
+    def __init__(self, creator, metrics=None, **kwargs):
+        super().__init__(creator, **kwargs)
+        self.metrics = metrics or PoolMetrics()
+
+    def _do_get(self):
+        start = perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.metrics.wait(perf_counter() - start)
+
+    def _do_return_conn(self, conn):
+        self.metrics.add(checkins=1)
+        super()._do_return_conn(conn)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def load_config():
+    if not environ.get('DB_CONFIG'):
+        return {}
+    with open(environ['DB_CONFIG']) as config_file:
+        return json.load(config_file)
+
+
+def load_profile(name=None):
+    config = load_config()
+    name = name or environ.get('DB_PROFILE') or config.get('profile', 'durable')
+    if name not in PROFILES:
+        raise Exception(f"Неизвестный профиль базы данных: {name}.")
+    return {**PROFILES[name], **config.get('pragmas', {})}
+
+
+def load_partitions():
+    return int(environ.get('ORDER_PARTITIONS') or load_config().get('order_partitions', 0))
+
+
+def create_partition_tables(partitions):
+    metadata = sa.MetaData()
+    return [sa.Table(f'open_orders_{group}', metadata, sa.Column('order_id', sa.Integer, primary_key=True),
+                     sa.Column('region', sa.Integer), sa.Column('weight', sa.Float),
+                     sa.Column('delivery_bitmap', Bitmap)) for group in range(partitions)]
+
+
+def init_partitions(engine, partitions):
+    global __partitions, __partition_tables
+
+    tables = create_partition_tables(partitions)
+    with engine.begin() as connection:
+        for name, in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND "
+                                        "name LIKE 'open_orders_%'").fetchall():
+            connection.execute(f'DROP TABLE {name}')
+        for table in tables:
+            table.create(connection)
+        __partitions, __partition_tables = partitions, tables
+        if not partitions:
+            return
+        orders = sa.table('orders', sa.column('order_id'), sa.column('region'), sa.column('weight'),
+                          sa.column('delivery_id'), sa.column('is_complete'), sa.column('delivery_bitmap', Bitmap))
+        add_open_orders(connection, [dict(row) for row in connection.execute(sa.select([
+            orders.c.order_id, orders.c.region, orders.c.weight, orders.c.delivery_bitmap]).where(
+            sa.and_(orders.c.delivery_id == None, orders.c.is_complete == 0)))])
+
+
+def get_partitions():
+    return __partitions
+
+
+def partition(region):
+    return region % __partitions if __partitions else 0
+
 
+def partition_table(group):
+    return __partition_tables[group]
 
-def global_init(db_file):
-    global __factory, __engine
+
+def add_open_orders(connection, rows):
+    if not __partitions:
+        return
+    groups = defaultdict(list)
+    for row in rows:
+        groups[partition(row['region'])].append(row)
+    for group, group_rows in groups.items():
+        connection.execute(__partition_tables[group].insert(), group_rows)
+
+
+def remove_open_orders(connection, orders):
+    if not __partitions:
+        return
+    groups = defaultdict(list)
+    for order_id, region in orders:
+        groups[partition(region)].append(order_id)
+    for group, order_ids in groups.items():
+        table = __partition_tables[group]
+        for i in range(0, len(order_ids), PARTITION_CHUNK):
+            connection.execute(table.delete().where(table.c.order_id.in_(order_ids[i:i + PARTITION_CHUNK])))
+
+
+def load_pool(read_only=False):
+    defaults, prefix = (READ_POOL, 'DB_READ_') if read_only else (POOL, 'DB_')
+    pool = {**defaults, **load_config().get('read_pool' if read_only else 'pool', {})}
+    for key in defaults:
+        if environ.get(f'{prefix}{key.upper()}'):
+            pool[key] = int(environ[f'{prefix}{key.upper()}'])
+    return pool
+
+
+def create_engine(db_file, profile=None, read_only=False):
+    pragmas = load_profile(profile)
+    if read_only:
+        pragmas = {**pragmas, 'query_only': 1}
+    engine = sa.create_engine(f'sqlite:///{db_file.strip()}?check_same_thread=False', echo=False,
+                              poolclass=MeasuredQueuePool, connect_args={'factory': metrics.MeasuredConnection},
+                              **load_pool(read_only))
+
+    @sa.event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma, value in pragmas.items():
+            cursor.execute(f'PRAGMA {pragma} = {value}')
+        cursor.close()
+
+    return engine
+
+
+def check_sqlite_version(version=sqlite3.sqlite_version_info):
+    if tuple(version) < SQLITE_VERSION:
+        raise Exception(f"Нужен SQLite {'.'.join(map(str, SQLITE_VERSION))} или новее (UPDATE ... FROM ... RETURNING), "
+                        f"установлен {'.'.join(map(str, version))}.")
+
+
+def global_init(db_file, profile=None):
+    global __factory, __engine, __read_factory, __read_engine
 
     if __factory:
         return __engine
 
+    check_sqlite_version()
+
     if not db_file or not db_file.strip():
         raise Exception("Необходимо указать файл базы данных.")
 
-    conn_str = f'sqlite:///{db_file.strip()}?check_same_thread=False'
-
-    engine = sa.create_engine(conn_str, echo=False)
+    engine = create_engine(db_file, profile)
     __factory = orm.sessionmaker(bind=engine)
 
     from . import __all_models
 
-    SqlAlchemyBase.metadata.create_all(engine)
+    migrate(engine, SqlAlchemyBase.metadata)
+    init_partitions(engine, load_partitions())
     __engine = engine
+    __read_engine = create_engine(db_file, profile, read_only=True)
+    __read_factory = orm.sessionmaker(bind=__read_engine)
+    sa.event.listen(__read_factory, 'before_flush', reject_flush)
     return __engine
 
 
-def create_session() -> Session:
-    global __factory
-    return __factory()
+def reject_flush(session, flush_context, instances):
+    raise Exception("Сессия GET-запроса только для чтения, для записи нужен create_session(read_only=False).")
+
+
+def get_engine(read_only=False):
+    return __read_engine if read_only else __engine
+
+
+# Внутри GET/HEAD-запроса по умолчанию возвращается сессия только для чтения (query_only),
+# запись в ней падает при flush; для записи нужно явно передать read_only=False.
+def create_session(read_only=None) -> Session:
+    if read_only is None:
+        read_only = has_request_context() and request.method in READ_METHODS
+    factory, engine, key = (__read_factory, __read_engine, 'db_read_session') if read_only else \
+        (__factory, __engine, 'db_session')
+    if not has_app_context():
+        return factory()
+    if key not in g:
+        setattr(g, key, factory())
+        engine.pool.metrics.add(sessions=1, open_sessions=1)
+    return getattr(g, key)
+
+
+def close_session(exception=None):
+    for key, engine in (('db_session', __engine), ('db_read_session', __read_engine)):
+        session = g.pop(key, None)
+        if session is not None:
+            if exception is not None:
+                session.rollback()
+            session.close()
+            engine.pool.metrics.add(open_sessions=-1)
+
+
+def get_engine_metrics(engine):
+    pool, metrics = engine.pool, engine.pool.metrics
+    return {'pool_size': pool.size(), 'checked_out': pool.checkedout(), 'overflow': max(pool.overflow(), 0),
+            'checkouts': metrics.checkouts, 'checkins': metrics.checkins,
+            'wait_time_total': round(metrics.wait_time, 6), 'wait_time_max': round(metrics.max_wait_time, 6),
+            'sessions': metrics.sessions, 'open_sessions': metrics.open_sessions}
+
+
+def get_pool_metrics():
+    return {**get_engine_metrics(__engine), 'read': get_engine_metrics(__read_engine)}
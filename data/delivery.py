@@ -1,12 +1,11 @@
 from sqlalchemy import orm, Column, Integer, DateTime, ForeignKey
-from sqlalchemy_serializer import SerializerMixin
 from sqlalchemy.orm import validates
-from .db_session import SqlAlchemyBase, create_session
-from .courier_types import CourierType
+from .db_session import SqlAlchemyBase
+from .courier_types import courier_type_registry
 from datetime import datetime
 
 
-class Delivery(SqlAlchemyBase, SerializerMixin):
+class Delivery(SqlAlchemyBase):
     __tablename__ = 'delivery'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -27,17 +26,14 @@ class Delivery(SqlAlchemyBase, SerializerMixin):
 
     @validates('id')
     def validate_id(self, key, value):
-        session = create_session()
-        ids = [delivery.id for delivery in session.query(Delivery).all()]
-        assert value not in ids and isinstance(value, int)
+        assert isinstance(value, int)
         return value
 
     @validates('courier_type')
     def validate_courier_type(self, key, value):
-        session = create_session()
-        types = {courier_type.title: courier_type.id for courier_type in session.query(CourierType).all()}
-        assert value in types
-        return types[value]
+        courier_type = courier_type_registry.get_by_title(value) if isinstance(value, str) else None
+        assert courier_type is not None
+        return courier_type.id
 
     @validates('assign_time')
     def validate_assign_time(self, key, value):
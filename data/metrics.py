@@ -0,0 +1,150 @@
+from flask import g, request, has_app_context, current_app
+from collections import defaultdict
+from time import perf_counter
+from threading import Lock
+from bisect import bisect_left
+import sqlite3
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BATCH_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+def render_histogram(name, labels, bounds, buckets, total):
+    lines, count = [], 0
+    for bound, bucket in zip(bounds + ('+Inf',), buckets):
+        count += bucket
+        lines.append(f'{name}_bucket{{{labels + "," if labels else ""}le="{bound}"}} {count}')
+    labels = f'{{{labels}}}' if labels else ''
+    return lines + [f'{name}_sum{labels} {total:.6f}', f'{name}_count{labels} {count}']
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.requests = defaultdict(int)
+            self.latency = defaultdict(lambda: [[0] * (len(BUCKETS) + 1), 0])
+            self.sql = defaultdict(lambda: [0, 0, 0])
+            self.batch_size = [[0] * (len(BATCH_BUCKETS) + 1), 0]
+            self.batch_latency = [[0] * (len(BUCKETS) + 1), 0]
+
+    def observe(self, endpoint, method, status, seconds, sql):
+        with self.lock:
+            self.requests[endpoint, method, status] += 1
+            latency = self.latency[endpoint, method]
+            latency[0][bisect_left(BUCKETS, seconds)] += 1
+            latency[1] += seconds
+            totals = self.sql[endpoint]
+            for i, value in enumerate(sql):
+                totals[i] += value
+
+    def observe_batch(self, size, latencies):
+        with self.lock:
+            self.batch_size[0][bisect_left(BATCH_BUCKETS, size)] += 1
+            self.batch_size[1] += size
+            for seconds in latencies:
+                self.batch_latency[0][bisect_left(BUCKETS, seconds)] += 1
+                self.batch_latency[1] += seconds
+
+    def render(self):
+        lines = ['# HELP http_requests_total Requests by endpoint, method and status.',
+                 '# TYPE http_requests_total counter']
+        with self.lock:
+            for (endpoint, method, status), count in sorted(self.requests.items()):
+                lines.append(f'http_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} '
+                             f'{count}')
+            lines += ['# HELP http_request_duration_seconds Request latency.',
+                      '# TYPE http_request_duration_seconds histogram']
+            for (endpoint, method), (buckets, total) in sorted(self.latency.items()):
+                lines += render_histogram('http_request_duration_seconds', f'endpoint="{endpoint}",method="{method}"',
+                                          BUCKETS, buckets, total)
+            for i, (name, help) in enumerate((('sql_statements_total', 'SQL statements executed'),
+                                              ('sql_duration_seconds_total', 'Time spent executing SQL'),
+                                              ('sql_rows_total', 'Rows fetched from SQL results'))):
+                lines += [f'# HELP {name} {help} by endpoint.', f'# TYPE {name} counter']
+                for endpoint, totals in sorted(self.sql.items()):
+                    value = f'{totals[i]:.6f}' if isinstance(totals[i], float) else totals[i]
+                    lines.append(f'{name}{{endpoint="{endpoint}"}} {value}')
+            if any(self.batch_size[0]):
+                lines += ['# HELP group_commit_batch_size Completions committed per transaction.',
+                          '# TYPE group_commit_batch_size histogram']
+                lines += render_histogram('group_commit_batch_size', '', BATCH_BUCKETS, *self.batch_size)
+                lines += ['# HELP group_commit_latency_seconds Time from enqueue to durable commit.',
+                          '# TYPE group_commit_latency_seconds histogram']
+                lines += render_histogram('group_commit_latency_seconds', '', BUCKETS, *self.batch_latency)
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+def get_endpoint():
+    view = current_app.view_functions.get(request.endpoint)
+    return getattr(getattr(view, 'view_class', None), '__name__', request.endpoint or 'unknown')
+
+
+def start_request():
+    g.metrics_start = perf_counter()
+    g.sql_metrics = [0, 0.0, 0]
+
+
+def finish_request(response):
+    if 'metrics_start' in g:
+        metrics.observe(get_endpoint(), request.method, response.status_code,
+                        perf_counter() - g.metrics_start, g.sql_metrics)
+    return response
+
+
+def init_app(app):
+    app.before_request(start_request)
+    app.after_request(finish_request)
+
+
+def add_sql(statements, seconds, rows):
+    if has_app_context() and 'sql_metrics' in g:
+        sql_metrics = g.sql_metrics
+        sql_metrics[0] += statements
+        sql_metrics[1] += seconds
+        sql_metrics[2] += rows
+
+
+class MeasuredCursor(sqlite3.Cursor):
+    def execute(self, *args):
+        start = perf_counter()
+        try:
+            return super().execute(*args)
+        finally:
+            add_sql(1, perf_counter() - start, 0)
+
+    def executemany(self, *args):
+        start = perf_counter()
+        try:
+            return super().executemany(*args)
+        finally:
+            add_sql(1, perf_counter() - start, 0)
+
+    def fetchone(self):
+        start = perf_counter()
+        row = super().fetchone()
+        add_sql(0, perf_counter() - start, row is not None)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        start = perf_counter()
+        rows = super().fetchmany(*args, **kwargs)
+        add_sql(0, perf_counter() - start, len(rows))
+        return rows
+
+    def fetchall(self):
+        start = perf_counter()
+        rows = super().fetchall()
+        add_sql(0, perf_counter() - start, len(rows))
+        return rows
+
+
+class MeasuredConnection(sqlite3.Connection):
+    def cursor(self, factory=MeasuredCursor):
+        return super().cursor(factory)
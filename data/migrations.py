@@ -0,0 +1,99 @@
+from .availability import working_bitmap, delivery_bitmap, BITMAP_SIZE
+from .rating import get_rating
+from collections import defaultdict
+
+INTERVAL_TABLES = ('courier_intervals', 'order_intervals')
+COLUMNS = (('couriers', 'working_bitmap', 'BLOB'), ('orders', 'delivery_bitmap', 'BLOB'))
+RATING_COLUMNS = (('couriers', 'min_delivery_time', 'REAL'), ('couriers', 'rating', 'REAL'))
+VERSION_COLUMNS = (('couriers', 'version', 'INTEGER NOT NULL DEFAULT 0'),)
+INDEXES = (('ix_orders_delivery_id_is_complete', 'orders', ('delivery_id', 'is_complete')),
+           ('ix_orders_region_is_complete_weight', 'orders', ('region', 'is_complete', 'weight')),
+           ('ix_regions_courier_id_number_region', 'regions', ('courier_id', 'number_region')),
+           ('ix_courier_intervals_courier_id', 'courier_intervals', ('courier_id',)),
+           ('ix_order_intervals_order_id', 'order_intervals', ('order_id',)))
+BITMAPS = (('couriers', 'courier_id', 'working_bitmap', 'courier_intervals', working_bitmap),
+           ('orders', 'order_id', 'delivery_bitmap', 'order_intervals', delivery_bitmap))
+
+
+def migrate_interval_minutes(connection):
+    for table in INTERVAL_TABLES:
+        for column in ('time_start', 'time_end'):
+            connection.execute(f"UPDATE {table} SET {column} = CAST(substr({column}, 1, 2) AS INTEGER) * 60 + "
+                               f"CAST(substr({column}, 4, 2) AS INTEGER) WHERE typeof({column}) = 'text'")
+
+
+def add_columns(connection, columns=COLUMNS):
+    for table, column, column_type in columns:
+        if column not in [row[1] for row in connection.execute(f'PRAGMA table_info({table})')]:
+            connection.execute(f'ALTER TABLE {table} ADD COLUMN {column} {column_type}')
+
+
+def backfill_bitmaps(connection):
+    for table, key, column, intervals_table, bitmap in BITMAPS:
+        intervals = defaultdict(list)
+        for id, time_start, time_end in connection.execute(
+                f'SELECT {table}.{key}, time_start, time_end FROM {table} LEFT JOIN {intervals_table} '
+                f'ON {intervals_table}.{key} = {table}.{key} WHERE {table}.{column} IS NULL'):
+            intervals[id].extend([] if time_start is None else [(time_start, time_end)])
+        for id, id_intervals in intervals.items():
+            connection.execute(f'UPDATE {table} SET {column} = ? WHERE {key} = ?',
+                               bitmap(id_intervals).to_bytes(BITMAP_SIZE, 'big'), id)
+
+
+def create_indexes(connection):
+    for name, table, columns in INDEXES:
+        connection.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({", ".join(columns)})')
+
+
+def backfill_ratings(connection):
+    min_delivery_times = connection.execute(
+        'SELECT couriers.courier_id, MIN(CAST(sum_time AS REAL) / orders_count) FROM couriers LEFT JOIN regions '
+        'ON regions.courier_id = couriers.courier_id AND orders_count != 0 GROUP BY couriers.courier_id').fetchall()
+    if min_delivery_times:
+        connection.execute('UPDATE couriers SET min_delivery_time = ?, rating = ? WHERE courier_id = ?',
+                           [(min_delivery_time, get_rating(min_delivery_time), id)
+                            for id, min_delivery_time in min_delivery_times])
+
+
+def add_ratings(connection):
+    add_columns(connection, RATING_COLUMNS)
+    backfill_ratings(connection)
+
+
+def add_versions(connection):
+    add_columns(connection, VERSION_COLUMNS)
+
+
+MIGRATIONS = (migrate_interval_minutes, add_columns, backfill_bitmaps, create_indexes, add_ratings, add_versions)
+
+
+def get_version(connection):
+    return connection.execute('PRAGMA user_version').scalar()
+
+
+def migrate(engine, metadata):
+    metadata.create_all(engine)
+    with engine.begin() as connection:
+        version = get_version(connection)
+        for number, migration in enumerate(MIGRATIONS[version:], version + 1):
+            migration(connection)
+            connection.execute(f'PRAGMA user_version = {number}')
+
+
+def main():
+    from .db_session import global_init
+    from sys import argv
+
+    db_file = argv[1] if len(argv) > 1 else 'db/base.db'
+    engine = global_init(db_file)
+    if '--backfill-ratings' in argv[2:]:
+        with engine.begin() as connection:
+            backfill_ratings(connection)
+            connection.execute('UPDATE couriers SET version = version + 1')
+        print(f'{db_file}: ratings recalculated')
+    with engine.connect() as connection:
+        print(f'{db_file}: schema version {get_version(connection)} of {len(MIGRATIONS)}')
+
+
+if __name__ == '__main__':
+    main()
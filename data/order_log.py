@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, Float, DateTime
+from .db_session import SqlAlchemyBase
+from .availability import Bitmap
+from datetime import datetime
+
+
+class OrderLog(SqlAlchemyBase):
+    __tablename__ = 'order_log'
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    order_id = Column(Integer)
+    region = Column(Integer)
+    weight = Column(Float)
+    delivery_bitmap = Column(Bitmap)
+    created = Column(DateTime, default=datetime.now)
@@ -1,18 +1,21 @@
-from sqlalchemy import orm, Column, Integer, Boolean, Float, ForeignKey
-from sqlalchemy_serializer import SerializerMixin
+from sqlalchemy import orm, Column, Integer, Boolean, Float, ForeignKey, CheckConstraint, Index
 from sqlalchemy.orm import validates
-from .db_session import SqlAlchemyBase, create_session
-from .delivery import Delivery
+from .db_session import SqlAlchemyBase
+from .availability import Bitmap
 
 
-class Order(SqlAlchemyBase, SerializerMixin):
+class Order(SqlAlchemyBase):
     __tablename__ = 'orders'
+    __table_args__ = (CheckConstraint('weight >= 0.01 AND weight <= 50'),
+                      Index('ix_orders_delivery_id_is_complete', 'delivery_id', 'is_complete'),
+                      Index('ix_orders_region_is_complete_weight', 'region', 'is_complete', 'weight'))
 
     order_id = Column(Integer, primary_key=True, autoincrement=True)
     delivery_id = Column(Integer, ForeignKey('delivery.id'))
     weight = Column(Float)
     region = Column(Integer)
     is_complete = Column(Boolean, default=False)
+    delivery_bitmap = Column(Bitmap)
 
     delivery_orm = orm.relation('Delivery')
 
@@ -20,9 +23,7 @@ class Order(SqlAlchemyBase, SerializerMixin):
 
     @validates('order_id')
     def validate_order_id(self, key, value):
-        session = create_session()
-        ids = [order.order_id for order in session.query(Order).all()]
-        assert value not in ids and isinstance(value, int)
+        assert isinstance(value, int)
         return value
 
     @validates('weight')
@@ -37,9 +38,7 @@ class Order(SqlAlchemyBase, SerializerMixin):
 
     @validates('delivery_id')
     def validate_delivery_id(self, key, value):
-        session = create_session()
-        ids = [delivery.id for delivery in session.query(Delivery).all()]
-        assert isinstance(value, int) and value in ids or value is None
+        assert isinstance(value, int) or value is None
         return value
 
     @validates('is_complete')
@@ -0,0 +1,7 @@
+MAX_DELIVERY_TIME = 60 * 60
+
+
+def get_rating(min_delivery_time):
+    if min_delivery_time is None:
+        min_delivery_time = MAX_DELIVERY_TIME
+    return (MAX_DELIVERY_TIME - min(MAX_DELIVERY_TIME, min_delivery_time)) / MAX_DELIVERY_TIME * 5
@@ -1,11 +1,11 @@
-from sqlalchemy import orm, Column, Integer, ForeignKey
-from sqlalchemy_serializer import SerializerMixin
+from sqlalchemy import orm, Column, Integer, ForeignKey, Index
 from sqlalchemy.orm import validates
 from .db_session import SqlAlchemyBase, create_session
 
 
-class Region(SqlAlchemyBase, SerializerMixin):
+class Region(SqlAlchemyBase):
     __tablename__ = 'regions'
+    __table_args__ = (Index('ix_regions_courier_id_number_region', 'courier_id', 'number_region'),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     number_region = Column(Integer)
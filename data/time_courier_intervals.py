@@ -1,28 +1,26 @@
-from sqlalchemy import orm, Column, Integer, Time, ForeignKey
-from sqlalchemy_serializer import SerializerMixin
+from sqlalchemy import orm, Column, Integer, ForeignKey, Index
 from sqlalchemy.orm import validates
-from .db_session import SqlAlchemyBase, create_session
-from datetime import datetime
+from .db_session import SqlAlchemyBase
+from .time_intervals import parse_interval, format_interval
 
 
-class CourierInterval(SqlAlchemyBase, SerializerMixin):
+class CourierInterval(SqlAlchemyBase):
     __tablename__ = 'courier_intervals'
+    __table_args__ = (Index('ix_courier_intervals_courier_id', 'courier_id'),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     courier_id = Column(Integer, ForeignKey('couriers.courier_id'))
-    time_start = Column(Time)
-    time_end = Column(Time)
+    time_start = Column(Integer)
+    time_end = Column(Integer)
 
     courier_orm = orm.relation('Courier')
 
     def __str__(self):
-        return f'{self.time_start.strftime("%H:%M")}-{self.time_end.strftime("%H:%M")}'
+        return format_interval(self.time_start, self.time_end)
 
     @validates('id')
     def validate_id(self, key, value):
-        session = create_session()
-        ids = [interval.id for interval in session.query(CourierInterval).all()]
-        assert value not in ids
+        assert isinstance(value, int)
         return value
 
     @validates('courier_id')
@@ -32,10 +30,8 @@ class CourierInterval(SqlAlchemyBase, SerializerMixin):
 
     @validates('time_start')
     def validate_time_start(self, key, value):
-        time_start = datetime.strptime(value.split('-')[0], '%H:%M').time()
-        return time_start
+        return parse_interval(value)[0]
 
     @validates('time_end')
     def validate_time_end(self, key, value):
-        time_end = datetime.strptime(value.split('-')[1], '%H:%M').time()
-        return time_end
+        return parse_interval(value)[1]
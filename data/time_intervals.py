@@ -0,0 +1,17 @@
+from functools import lru_cache
+from datetime import datetime
+
+
+def parse_time(value):
+    time = datetime.strptime(value, '%H:%M')
+    return time.hour * 60 + time.minute
+
+
+@lru_cache(maxsize=4096)
+def parse_interval(value):
+    time_start, time_end = value.split('-')[:2]
+    return parse_time(time_start), parse_time(time_end)
+
+
+def format_interval(time_start, time_end):
+    return f'{time_start // 60:02}:{time_start % 60:02}-{time_end // 60:02}:{time_end % 60:02}'
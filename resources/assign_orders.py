@@ -0,0 +1,75 @@
+from data.courier_types import courier_type_registry
+from data.availability import courier_bitmap
+from sqlalchemy import bindparam, func, text
+from .order_index import order_index
+from .check_order import check_order
+from .check_ids import CHUNK_SIZE
+from data.delivery import Delivery
+from data.couriers import Courier
+from data.orders import Order
+from data import db_session
+
+
+def select_orders(courier, regions):
+    working_bitmap = courier_bitmap(courier)
+    sum_weight = courier.sum_weight
+    carrying = courier_type_registry.get(courier.courier_type).carrying
+    orders = []
+    for order in order_index.candidates([region.number_region for region in regions], carrying - sum_weight):
+        if sum_weight + order.weight > carrying:
+            break
+        if check_order(order, regions, working_bitmap, sum_weight, carrying):
+            orders.append(order)
+            sum_weight += order.weight
+    order_index.remove(order.order_id for order in orders)
+    return orders
+
+
+CLAIM = ('UPDATE orders SET delivery_id = claims.column2 FROM (VALUES {}) AS claims JOIN couriers '
+         'ON couriers.courier_id = claims.column2 AND couriers.version = claims.column3 '
+         'WHERE orders.order_id = claims.column1 AND orders.delivery_id IS NULL AND orders.is_complete = 0 '
+         'RETURNING order_id')
+
+
+def claim_orders(session, assignments):
+    rows = [(order.order_id, courier.courier_id, courier.version)
+            for courier, orders in assignments for order in orders]
+    claimed = set()
+    for i in range(0, len(rows), CHUNK_SIZE):
+        chunk = rows[i:i + CHUNK_SIZE]
+        claimed.update(order_id for order_id, in session.execute(
+            text(CLAIM.format(', '.join(f'(:o{j}, :c{j}, :v{j})' for j in range(len(chunk))))),
+            {f'{key}{j}': value for j, row in enumerate(chunk) for key, value in zip('ocv', row)}))
+    db_session.remove_open_orders(session, [(order.order_id, order.region) for _, orders in assignments
+                                            for order in orders if order.order_id in claimed])
+    lost = [order.order_id for _, orders in assignments for order in orders if order.order_id not in claimed]
+    for i in range(0, len(lost), CHUNK_SIZE):
+        still_open = {order_id for order_id, in session.query(Order.order_id).filter(
+            Order.order_id.in_(lost[i:i + CHUNK_SIZE]), Order.delivery_id == None, Order.is_complete == 0)}
+        order_index.add(order for _, orders in assignments for order in orders if order.order_id in still_open)
+    return [(courier, [order for order in orders if order.order_id in claimed]) for courier, orders in assignments]
+
+
+def save_assignments(session, assignments, assign_time):
+    assign_time_param = bindparam('b_assign_time', type_=Delivery.assign_time.type)
+    deliveries = Delivery.__table__.update().where(Delivery.id == bindparam('b_id')).values(
+        assign_time=assign_time_param, courier_type=bindparam('b_courier_type'),
+        complete_time=func.coalesce(Delivery.complete_time, assign_time_param))
+    couriers = Courier.__table__.update().where(Courier.courier_id == bindparam('b_courier_id')).values(
+        sum_weight=Courier.sum_weight + bindparam('b_weight'), delivery_now=bindparam('b_courier_id'),
+        version=Courier.version + 1)
+    try:
+        claimed = claim_orders(session, assignments)
+        assigned = [(courier, orders) for courier, orders in claimed if orders]
+        if assigned:
+            session.execute(deliveries, [{'b_id': courier.courier_id, 'b_assign_time': assign_time,
+                                          'b_courier_type': courier.courier_type} for courier, _ in assigned])
+            session.execute(couriers, [{'b_courier_id': courier.courier_id,
+                                        'b_weight': sum(order.weight for order in orders)}
+                                       for courier, orders in assigned])
+        session.commit()
+    except Exception:
+        session.rollback()
+        order_index.add(order for _, orders in assignments for order in orders)
+        raise
+    return claimed
@@ -0,0 +1,57 @@
+from data.time_courier_intervals import CourierInterval
+from data.time_order_intervals import OrderInterval
+from data.availability import working_bitmap, delivery_bitmap
+from data.time_intervals import parse_interval
+from data.delivery import Delivery
+from data.couriers import Courier
+from data.regions import Region
+from data.orders import Order
+from time import perf_counter
+
+COURIER_TABLES = (Delivery.__table__, Courier.__table__, Region.__table__, CourierInterval.__table__)
+ORDER_TABLES = (Order.__table__, OrderInterval.__table__)
+
+
+def intervals_rows(key, id, intervals):
+    rows = []
+    for interval in intervals:
+        time_start, time_end = parse_interval(interval)
+        rows.append({key: id, 'time_start': time_start, 'time_end': time_end})
+    return rows
+
+
+def courier_rows(courier_data, types):
+    courier_id, courier_type = courier_data['courier_id'], courier_data['courier_type']
+    assert isinstance(courier_id, int) and isinstance(courier_type, str) and courier_type in types
+    assert isinstance(courier_data['regions'], list) and isinstance(courier_data['working_hours'], list)
+    assert all(isinstance(number, int) for number in courier_data['regions'])
+    intervals = intervals_rows('courier_id', courier_id, courier_data['working_hours'])
+    bitmap = working_bitmap((interval['time_start'], interval['time_end']) for interval in intervals)
+    return ([{'id': courier_id, 'courier_type': None, 'assign_time': None, 'complete_time': None}],
+            [{'courier_id': courier_id, 'courier_type': types[courier_type], 'sum_weight': 0, 'earnings': 0,
+              'delivery_now': None, 'working_bitmap': bitmap, 'version': 0}],
+            [{'courier_id': courier_id, 'number_region': number, 'orders_count': 0, 'sum_time': 0}
+             for number in courier_data['regions']],
+            intervals)
+
+
+def order_rows(order_data):
+    order_id, weight, region = order_data['order_id'], order_data['weight'], order_data['region']
+    assert isinstance(order_id, int) and isinstance(region, int)
+    assert isinstance(weight, (int, float)) and 0.01 <= weight <= 50 and weight == round(weight, 2)
+    assert isinstance(order_data['delivery_hours'], list)
+    intervals = intervals_rows('order_id', order_id, order_data['delivery_hours'])
+    bitmap = delivery_bitmap((interval['time_start'], interval['time_end']) for interval in intervals)
+    return ([{'order_id': order_id, 'delivery_id': None, 'weight': weight, 'region': region, 'is_complete': False,
+              'delivery_bitmap': bitmap}],
+            intervals)
+
+
+def bulk_insert(session, tables, rows):
+    start = perf_counter()
+    for table, table_rows in zip(tables, rows):
+        if table_rows:
+            session.execute(table.insert(), table_rows)
+    session.commit()
+    count = sum(len(table_rows) for table_rows in rows)
+    return count, count / max(perf_counter() - start, 1e-9)
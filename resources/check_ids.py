@@ -0,0 +1,14 @@
+from collections import Counter
+
+CHUNK_SIZE = 500
+
+
+def check_ids(session, columns, ids):
+    counter = Counter(id for id in ids if isinstance(id, int))
+    wrong_ids = {id for id, count in counter.items() if count > 1}
+    unique_ids = list(counter)
+    for column in columns:
+        for i in range(0, len(unique_ids), CHUNK_SIZE):
+            chunk = unique_ids[i:i + CHUNK_SIZE]
+            wrong_ids.update(id for id, in session.query(column).filter(column.in_(chunk)))
+    return wrong_ids
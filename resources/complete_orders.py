@@ -0,0 +1,146 @@
+from concurrent.futures import Future
+from queue import Queue, Empty
+from threading import Thread, Lock
+from sqlalchemy import func, Float
+from data.courier_types import courier_type_registry
+from .order_index import order_index
+from .courier_cache import courier_cache
+from data.metrics import metrics
+from data.couriers import Courier
+from data.regions import Region
+from data.rating import get_rating
+from data.orders import Order
+from datetime import datetime
+from time import perf_counter
+from data import db_session
+from os import environ
+import logging
+
+WINDOW = 2
+BATCH_SIZE = 256
+TIMEOUT = 30
+INVALID = (LookupError, ValueError, TypeError)
+
+logger = logging.getLogger(__name__)
+
+
+def update_rating(session, courier):
+    courier.min_delivery_time = session.query(
+        func.min(func.cast(Region.sum_time, Float) / Region.orders_count)).filter(
+        Region.courier_id == courier.courier_id, Region.orders_count != 0).scalar()
+    courier.rating = get_rating(courier.min_delivery_time)
+
+
+def complete_order(session, courier, order, complete_time):
+    time_complete = datetime.strptime(complete_time, '%Y-%m-%dT%H:%M:%S.%fZ')
+    region = session.query(Region).filter(Region.number_region == order.region,
+                                          Region.courier_orm == courier).first()
+    if region is None:
+        raise LookupError(order.order_id)
+    delivery_time = (time_complete - courier.delivery_orm.complete_time).total_seconds()
+
+    order.is_complete = True
+    courier.sum_weight -= order.weight
+    region.orders_count += 1
+    region.sum_time += delivery_time
+    update_rating(session, courier)
+    courier.delivery_orm.complete_time = complete_time
+    courier.version += 1
+
+    if not session.query(Order.order_id).filter(Order.delivery_orm == courier.delivery_orm,
+                                                Order.is_complete == 0).first():
+        courier.earnings += 500 * courier_type_registry.get(courier.delivery_orm.courier_type).coefficient
+
+
+class Completion:
+    def __init__(self, courier_id, order_id, complete_time):
+        self.courier_id = courier_id
+        self.order_id = order_id
+        self.complete_time = complete_time
+        self.future = Future()
+        self.start = perf_counter()
+
+
+class CompletionQueue:
+    def __init__(self, enabled=None, window=None, batch_size=None):
+        self.lock = Lock()
+        self.enabled = enabled if enabled is not None else environ.get('GROUP_COMMIT', '0') == '1'
+        self.window = (window or float(environ.get('GROUP_COMMIT_WINDOW', WINDOW))) / 1000
+        self.batch_size = batch_size or int(environ.get('GROUP_COMMIT_BATCH_SIZE', BATCH_SIZE))
+        self.timeout = float(environ.get('GROUP_COMMIT_TIMEOUT', TIMEOUT))
+        self.queue = Queue()
+        self.thread = None
+
+    def submit(self, courier_id, order_id, complete_time):
+        with self.lock:
+            if self.thread is None:
+                self.thread = Thread(target=self.run, daemon=True)
+                self.thread.start()
+        completion = Completion(courier_id, order_id, complete_time)
+        self.queue.put(completion)
+        return completion.future
+
+    def collect(self):
+        batch = [self.queue.get()]
+        deadline = perf_counter() + self.window
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get(timeout=max(deadline - perf_counter(), 0)))
+            except Empty:
+                break
+        return batch
+
+    def run(self):
+        while True:
+            try:
+                self.commit(self.collect())
+            except Exception:
+                logger.exception('Group commit failed')
+
+    def apply(self, session, completion):
+        courier = session.query(Courier).filter(Courier.courier_id == completion.courier_id).first()
+        order = session.query(Order).filter(Order.delivery_id == courier.delivery_now,
+                                            Order.order_id == completion.order_id).first()
+        if order is None:
+            raise LookupError(completion.order_id)
+        if not order.is_complete:
+            complete_order(session, courier, order, completion.complete_time)
+        return courier.courier_id
+
+    def write(self, batch, errors):
+        session = db_session.create_session()
+        applied = []
+        try:
+            for completion in batch:
+                try:
+                    applied.append((completion, self.apply(session, completion)))
+                except INVALID as error:
+                    errors[completion] = error
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        return applied
+
+    def commit(self, batch):
+        errors = {}
+        try:
+            applied = self.write(batch, errors)
+        except Exception as error:
+            errors = {completion: errors.get(completion, error) for completion in batch}
+            applied = []
+        try:
+            order_index.remove([completion.order_id for completion, _ in applied])
+            courier_cache.bump([courier_id for _, courier_id in applied])
+            metrics.observe_batch(len(batch), [perf_counter() - completion.start for completion in batch])
+        finally:
+            for completion in batch:
+                if completion in errors:
+                    completion.future.set_exception(errors[completion])
+                else:
+                    completion.future.set_result(completion.order_id)
+
+
+completion_queue = CompletionQueue()
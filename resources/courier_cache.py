@@ -0,0 +1,60 @@
+from werkzeug.http import generate_etag
+from collections import OrderedDict
+from threading import Lock
+from os import environ
+
+CACHE_SIZE = 1024
+
+
+class CourierCache:
+    def __init__(self, size=None):
+        self.lock = Lock()
+        self.size = size or int(environ.get('COURIER_CACHE_SIZE', CACHE_SIZE))
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.entries = OrderedDict()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def __contains__(self, courier_id):
+        with self.lock:
+            return courier_id in self.entries
+
+    def get(self, courier_id, version):
+        with self.lock:
+            entry = self.entries.get(courier_id)
+            if entry is None or entry[0] != version:
+                self.entries.pop(courier_id, None)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(courier_id)
+            self.hits += 1
+            return entry[1:]
+
+    def put(self, courier_id, version, data):
+        entry = (version, generate_etag(data), data)
+        with self.lock:
+            current = self.entries.get(courier_id)
+            if current is None or current[0] <= version:
+                self.entries[courier_id] = entry
+                self.entries.move_to_end(courier_id)
+                while len(self.entries) > self.size:
+                    self.entries.popitem(last=False)
+                    self.evictions += 1
+        return entry[1:]
+
+    def bump(self, courier_ids):
+        with self.lock:
+            for courier_id in courier_ids:
+                self.entries.pop(courier_id, None)
+
+    def get_metrics(self):
+        with self.lock:
+            return {'size': len(self.entries), 'max_size': self.size,
+                    'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+
+courier_cache = CourierCache()
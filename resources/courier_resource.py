@@ -1,11 +1,20 @@
 from data.time_courier_intervals import CourierInterval
-from flask import jsonify, make_response, request
+from flask import request, current_app
+from .bulk_insert import COURIER_TABLES, courier_rows, bulk_insert
+from data.courier_types import courier_type_registry
 from flask_restful import Resource, abort
-from .check_order import check_order
+from sqlalchemy.exc import IntegrityError
+from .check_ids import check_ids
+from .stream_ingest import validate_chunk, ingest_response
+from .revalidate_orders import update_regions, update_intervals, revalidate_orders
+from data.availability import courier_bitmap
+from .order_index import order_index, log_orders
+from .courier_cache import courier_cache
+from .complete_orders import update_rating
+from .serializers import json_response, ids_response, validation_error_response, courier_profile
 from data.delivery import Delivery
 from data.couriers import Courier
 from data.regions import Region
-from data.orders import Order
 from data import db_session
 
 
@@ -15,6 +24,10 @@ class CouriersListResource(Resource):
         session = db_session.create_session()
         not_validated = []
         validated = []
+        rows = tuple([] for _ in COURIER_TABLES)
+        types = courier_type_registry.get_ids()
+        wrong_ids = check_ids(session, [Courier.courier_id, Delivery.id],
+                              [courier_data.get('courier_id') for courier_data in request.json['data']])
 
         for courier_data in request.json['data']:
             if not all(key in courier_data for key in keys) or len(courier_data) != len(keys):
@@ -22,25 +35,44 @@ class CouriersListResource(Resource):
                 continue
 
             try:
-                assert isinstance(courier_data['regions'], list) and isinstance(courier_data['working_hours'], list)
-                courier = Courier(courier_id=courier_data['courier_id'], courier_type=courier_data['courier_type'])
-                delivery = Delivery(id=courier_data['courier_id'])
-                regions = [Region(courier_id=courier_data['courier_id'], number_region=number)
-                           for number in courier_data['regions']]
-                intervals = [CourierInterval(courier_id=courier_data['courier_id'], time_start=time, time_end=time)
-                             for time in courier_data['working_hours']]
-                validated.extend([courier, delivery] + regions + intervals)
+                assert courier_data['courier_id'] not in wrong_ids
+                for table_rows, new_rows in zip(rows, courier_rows(courier_data, types)):
+                    table_rows.extend(new_rows)
+                validated.append(courier_data['courier_id'])
             except Exception:
                 not_validated.append(courier_data['courier_id'])
                 continue
 
         if not_validated:
-            return make_response(jsonify({'validation_error': {'couriers': [{'id': id} for id in not_validated]}}), 400)
-        for chto_to in validated:
-            session.add(chto_to)
-        session.commit()
-        return make_response(jsonify({'couriers': [
-            {'id': courier.courier_id} for courier in filter(lambda x: isinstance(x, Courier), validated)]}), 201)
+            return validation_error_response('couriers', not_validated)
+        try:
+            count, speed = bulk_insert(session, COURIER_TABLES, rows)
+        except IntegrityError:
+            session.rollback()
+            wrong_ids = check_ids(session, [Courier.courier_id, Delivery.id], validated)
+            return validation_error_response('couriers', [id for id in validated if id in wrong_ids or not wrong_ids])
+        current_app.logger.info('POST /couriers: %d rows inserted, %.0f rows/s', count, speed)
+        return ids_response('couriers', validated, 201)
+
+
+def validate_couriers(session, chunk):
+    types = courier_type_registry.get_ids()
+    return validate_chunk(session, chunk, ['courier_id', 'courier_type', 'working_hours', 'regions'],
+                          [Courier.courier_id, Delivery.id], lambda courier_data: courier_rows(courier_data, types),
+                          len(COURIER_TABLES))
+
+
+def insert_couriers(session, rows):
+    return bulk_insert(session, COURIER_TABLES, rows)
+
+
+class CouriersStreamResource(Resource):
+    def post(self):
+        session = db_session.create_session()
+        try:
+            return ingest_response(session, 'couriers', validate_couriers, insert_couriers)
+        except ValueError:
+            abort(400)
 
 
 class CouriersResource(Resource):
@@ -57,75 +89,59 @@ class CouriersResource(Resource):
             abort(400)
 
         try:
+            old_carrying = courier_type_registry.get(courier.courier_type).carrying
+            old_bitmap = courier_bitmap(courier)
+            removed_regions = set()
             if 'courier_type' in request.json:
                 courier.courier_type = request.json['courier_type']
-
             if 'regions' in request.json:
-                assert isinstance(request.json['regions'], list)
-                courier_regions = {region.number_region: region for region in session.query(Region).filter(
-                    Region.courier_orm == courier).all()}
-                for key, value in courier_regions.items():
-                    if key not in request.json['regions']:
-                        session.delete(value)
-
-                for region in request.json['regions']:
-                    if region not in courier_regions:
-                        session.add(Region(courier_id=courier_id, number_region=region))
-
-            if 'working_hours' in request.json:
-                assert isinstance(request.json['working_hours'], list)
-                courier_intervals = {str(interval): interval for interval in session.query(CourierInterval).filter(
-                    CourierInterval.courier_orm == courier).all()}
-                for key, value in courier_intervals.items():
-                    if key not in request.json['working_hours']:
-                        session.delete(value)
-
-                for interval in request.json['working_hours']:
-                    if interval not in courier_intervals:
-                        session.add(CourierInterval(courier_id=courier_id, time_start=interval, time_end=interval))
+                removed_regions = update_regions(session, courier_id, request.json['regions'])
+                if removed_regions:
+                    update_rating(session, courier)
+            courier.working_bitmap = update_intervals(session, courier_id, request.json['working_hours']) \
+                if 'working_hours' in request.json else old_bitmap
+            orders_unassign = revalidate_orders(session, courier, removed_regions, old_bitmap, old_carrying)
         except Exception:
             abort(400)
+        courier.version += 1
+        courier_type = courier_type_registry.get(courier.courier_type).title
+        log_orders(session, orders_unassign)
         session.commit()
-
-        orders = sorted(session.query(Order).filter(Order.delivery_orm == courier.delivery_orm,
-                                                    Order.is_complete == 0).all(), key=lambda x: x.weight)
-        courier_regions = session.query(Region).filter(Region.courier_orm == courier).all()
-        courier_intervals = session.query(CourierInterval).filter(CourierInterval.courier_orm == courier).all()
-        courier_carrying = courier.courier_type_orm.carrying
-        courier_sum_weight = 0
-        for order in orders:
-            try:
-                if not check_order(order, courier_regions, courier_intervals, courier_sum_weight, courier_carrying):
-                    order.delivery_id = None
-                else:
-                    courier_sum_weight += order.weight
-            except Exception:
-                abort(400)
-        courier.sum_weight = courier_sum_weight
-        session.commit()
-        return make_response(jsonify(
-            {'courier_id': courier.courier_id,
-             'courier_type': courier.courier_type_orm.title,
-             'regions': [x.number_region for x in session.query(Region).filter(Region.courier_orm == courier).all()],
-             'working_hours': [str(x) for x in session.query(CourierInterval).filter(
-                 CourierInterval.courier_orm == courier).all()]}))
+        order_index.add(orders_unassign)
+        courier_cache.bump([courier_id])
+        return json_response(courier_profile(
+            courier_id, courier_type,
+            [number for number, in session.query(Region.number_region).filter(Region.courier_id == courier_id)],
+            session.query(CourierInterval.time_start, CourierInterval.time_end).filter(
+                CourierInterval.courier_id == courier_id).all()))
 
     def get(self, courier_id):
         if not courier_id.isdigit():
             abort(400)
         courier_id = int(courier_id)
         session = db_session.create_session()
-        courier = session.query(Courier).filter(Courier.courier_id == courier_id).first()
-        if not courier:
-            abort(400)
-
-        courier_regions = [r.number_region for r in session.query(Region).filter(Region.courier_orm == courier)]
-        working_hours = [str(i) for i in session.query(CourierInterval).filter(CourierInterval.courier_orm == courier)]
-        courier_data = {'courier_id': courier_id, 'courier_type': courier.courier_type_orm.title,
-                        'earnings': courier.earnings, 'regions': courier_regions, 'working_hours': working_hours}
-        if courier.earnings:
-            regions = session.query(Region).filter(Region.courier_orm == courier, Region.orders_count != 0).all()
-            min_delivery_time = min([60 * 60] + [region.sum_time / region.orders_count for region in regions])
-            rating = (60 * 60 - min_delivery_time) / 60 / 60 * 5
-            courier_data['rating'] = round(rating, 2)
-        return make_response(jsonify(courier_data))
+        version = None
+        if courier_id in courier_cache:
+            version = session.query(Courier.version).filter(Courier.courier_id == courier_id).scalar()
+        entry = courier_cache.get(courier_id, version)
+        if entry is None:
+            courier = session.query(Courier.version, Courier.courier_type, Courier.earnings, Courier.rating).filter(
+                Courier.courier_id == courier_id).first()
+            if not courier:
+                abort(400)
+            courier_regions = [number for number, in session.query(Region.number_region).filter(
+                Region.courier_id == courier_id)]
+            working_hours = session.query(CourierInterval.time_start, CourierInterval.time_end).filter(
+                CourierInterval.courier_id == courier_id).all()
+            body = courier_profile(courier_id, courier_type_registry.get(courier.courier_type).title, courier_regions,
+                                   working_hours, courier.earnings,
+                                   round(courier.rating or 0, 2) if courier.earnings else None)
+            entry = courier_cache.put(courier_id, courier.version, body)
+
+        etag, body = entry
+        if request.if_none_match.contains(etag):
+            response = json_response(b'', 304)
+        else:
+            response = json_response(body)
+        response.set_etag(etag)
+        return response
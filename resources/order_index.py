@@ -0,0 +1,151 @@
+from data.time_order_intervals import OrderInterval
+from data.availability import delivery_bitmap
+from bisect import bisect_left, bisect_right, insort
+from collections import namedtuple, defaultdict
+from datetime import datetime, timedelta
+from data.order_log import OrderLog
+from itertools import islice
+from data.orders import Order
+from threading import RLock
+from sqlalchemy import func
+from .check_ids import CHUNK_SIZE
+from data import db_session
+from heapq import merge
+
+SORT_THRESHOLD = 16
+LOG_TTL = timedelta(hours=1)
+
+OpenOrder = namedtuple('OpenOrder', ['order_id', 'region', 'weight', 'delivery_bitmap'])
+
+
+class OrderIndex:
+    def __init__(self, partitions=None):
+        self.lock = RLock()
+        self.partition_count = partitions
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.loaded = False
+            self.partitions = set()
+            self.seq = 0
+            self.orders = {}
+            self.regions = defaultdict(list)
+
+    def groups(self):
+        return db_session.get_partitions() if self.partition_count is None else self.partition_count
+
+    def partition(self, region):
+        return region % self.groups() if self.groups() else 0
+
+    def is_loaded(self, region):
+        return self.loaded or self.partition(region) in self.partitions
+
+    def load(self, session, regions=None):
+        with self.lock:
+            if self.loaded:
+                return
+            partitions = None
+            if self.groups() and regions is not None:
+                partitions = {self.partition(region) for region in regions} - self.partitions
+                if not partitions:
+                    return
+            if not self.partitions:
+                self.seq = session.query(func.max(OrderLog.seq)).scalar() or 0
+            if partitions is None:
+                orders = self.load_orders(session)
+                self.loaded = True
+            else:
+                orders = [order for group in partitions for order in self.load_partition(session, group)]
+                self.partitions |= partitions
+            self.add(orders)
+
+    def load_orders(self, session):
+        open_filter = (Order.delivery_id == None, Order.is_complete == 0)
+        intervals = defaultdict(list)
+        for order_id, time_start, time_end in session.query(
+                OrderInterval.order_id, OrderInterval.time_start, OrderInterval.time_end).join(
+                Order, Order.order_id == OrderInterval.order_id).filter(Order.delivery_bitmap == None, *open_filter):
+            intervals[order_id].append((time_start, time_end))
+        return [OpenOrder(order_id, region, weight, delivery_bitmap(intervals[order_id]) if bitmap is None else bitmap)
+                for order_id, region, weight, bitmap in session.query(
+                    Order.order_id, Order.region, Order.weight, Order.delivery_bitmap).filter(*open_filter)]
+
+    def load_partition(self, session, group):
+        table = db_session.partition_table(group)
+        orders = session.query(table.c.order_id, table.c.region, table.c.weight, table.c.delivery_bitmap).all()
+        missing = [order_id for order_id, _, _, bitmap in orders if bitmap is None]
+        intervals = defaultdict(list)
+        for i in range(0, len(missing), CHUNK_SIZE):
+            for order_id, time_start, time_end in session.query(
+                    OrderInterval.order_id, OrderInterval.time_start, OrderInterval.time_end).filter(
+                    OrderInterval.order_id.in_(missing[i:i + CHUNK_SIZE])):
+                intervals[order_id].append((time_start, time_end))
+        return [OpenOrder(order_id, region, weight, delivery_bitmap(intervals[order_id]) if bitmap is None else bitmap)
+                for order_id, region, weight, bitmap in orders]
+
+    def sync(self, session, regions=None):
+        with self.lock:
+            if self.loaded or self.partitions:
+                first_seq = session.query(func.min(OrderLog.seq)).scalar()
+                if first_seq is not None and first_seq > self.seq + 1:
+                    self.reset()
+                else:
+                    log = session.query(OrderLog.seq, OrderLog.order_id, OrderLog.region, OrderLog.weight,
+                                        OrderLog.delivery_bitmap).filter(OrderLog.seq > self.seq).all()
+                    self.seq = max([self.seq] + [row[0] for row in log])
+                    self.add(OpenOrder(*row[1:]) for row in log)
+            self.load(session, regions)
+
+    def add(self, orders):
+        with self.lock:
+            if not self.loaded and not self.partitions:
+                return
+            new_orders = defaultdict(list)
+            for order in orders:
+                if order.order_id not in self.orders and self.is_loaded(order.region):
+                    self.orders[order.order_id] = order
+                    new_orders[order.region].append((order.weight, order.order_id))
+            for number, keys in new_orders.items():
+                region = self.regions[number]
+                if len(keys) < SORT_THRESHOLD:
+                    for key in keys:
+                        insort(region, key)
+                else:
+                    region.extend(keys)
+                    region.sort()
+
+    def remove(self, order_ids):
+        with self.lock:
+            for order_id in order_ids:
+                order = self.orders.pop(order_id, None)
+                if order is not None:
+                    region = self.regions[order.region]
+                    del region[bisect_left(region, (order.weight, order.order_id))]
+
+    def candidates(self, regions, capacity):
+        iterators = []
+        for number in set(regions):
+            region = self.regions.get(number, [])
+            iterators.append(islice(region, bisect_right(region, (capacity + 1e-9, float('inf')))))
+        for weight, order_id in merge(*iterators):
+            yield self.orders[order_id]
+
+
+def log_orders(session, orders):
+    orders = [{'order_id': order.order_id, 'region': order.region, 'weight': order.weight,
+               'delivery_bitmap': order.delivery_bitmap, 'created': datetime.now()} for order in orders]
+    if orders:
+        session.execute(OrderLog.__table__.insert(), orders)
+        db_session.add_open_orders(session, [{key: order[key] for key in OpenOrder._fields} for order in orders])
+
+
+def prune_log(session):
+    last_seq = session.query(func.max(OrderLog.seq)).scalar()
+    if last_seq is None:
+        return
+    session.query(OrderLog).filter(OrderLog.created < datetime.now() - LOG_TTL, OrderLog.seq < last_seq).delete(
+        synchronize_session=False)
+
+
+order_index = OrderIndex()
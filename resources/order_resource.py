@@ -1,22 +1,54 @@
-from data.time_courier_intervals import CourierInterval
-from data.time_order_intervals import OrderInterval
-from flask import jsonify, make_response, request
+from flask import request, current_app
+from .bulk_insert import ORDER_TABLES, order_rows, bulk_insert
 from flask_restful import Resource, abort
-from .check_order import check_order
-from data.delivery import Delivery
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
+from .assign_orders import select_orders, save_assignments
+from .complete_orders import complete_order, completion_queue, INVALID
+from .check_ids import check_ids
+from .stream_ingest import validate_chunk, ingest_response
+from .courier_cache import courier_cache
+from .serializers import json_response, ids_response, validation_error_response, assign_result, \
+    batch_assign_result, order_complete_result
+from .order_index import order_index, OpenOrder, log_orders, prune_log
 from data.couriers import Courier
+from data.delivery import Delivery
 from data.regions import Region
 from data.orders import Order
 from datetime import datetime
 from data import db_session
 
 
+def insert_orders(session, rows):
+    open_orders = [OpenOrder(row['order_id'], row['region'], row['weight'], row['delivery_bitmap'])
+                   for row in rows[0]]
+    prune_log(session)
+    log_orders(session, open_orders)
+    count, speed = bulk_insert(session, ORDER_TABLES, rows)
+    order_index.add(open_orders)
+    return count, speed
+
+
+def validate_orders(session, chunk):
+    return validate_chunk(session, chunk, ['order_id', 'weight', 'region', 'delivery_hours'], [Order.order_id],
+                          order_rows, len(ORDER_TABLES))
+
+
+def current_orders(session, delivery_id):
+    return session.query(Order.order_id, Delivery.assign_time).join(
+        Delivery, Delivery.id == Order.delivery_id).filter(Order.delivery_id == delivery_id,
+                                                           Order.is_complete == 0).all()
+
+
 class OrdersListResource(Resource):
     def post(self):
         keys = ['order_id', 'weight', 'region', 'delivery_hours']
         session = db_session.create_session()
         not_validated = []
         validated = []
+        rows = tuple([] for _ in ORDER_TABLES)
+        wrong_ids = check_ids(session, [Order.order_id],
+                              [order_data.get('order_id') for order_data in request.json['data']])
 
         for order_data in request.json['data']:
             if not all(key in order_data for key in keys) or len(order_data) != len(keys):
@@ -24,28 +56,39 @@ class OrdersListResource(Resource):
                 continue
 
             try:
-                assert isinstance(order_data['delivery_hours'], list)
-                order = Order(order_id=order_data['order_id'], weight=order_data['weight'], region=order_data['region'])
-                intervals = [OrderInterval(order_id=order_data['order_id'], time_start=time, time_end=time)
-                             for time in order_data['delivery_hours']]
-                validated.extend([order] + intervals)
+                assert order_data['order_id'] not in wrong_ids
+                for table_rows, new_rows in zip(rows, order_rows(order_data)):
+                    table_rows.extend(new_rows)
+                validated.append(order_data['order_id'])
             except Exception:
                 not_validated.append(order_data['order_id'])
                 continue
 
         if not_validated:
-            return make_response(jsonify({'validation_error': {'orders': [{'id': id} for id in not_validated]}}), 400)
-        for chto_to in validated:
-            session.add(chto_to)
-        session.commit()
-        return make_response(jsonify({'orders': [
-            {'id': order.order_id} for order in filter(lambda x: isinstance(x, Order), validated)]}), 201)
+            return validation_error_response('orders', not_validated)
+        try:
+            count, speed = insert_orders(session, rows)
+        except IntegrityError:
+            session.rollback()
+            wrong_ids = check_ids(session, [Order.order_id], validated)
+            return validation_error_response('orders', [id for id in validated if id in wrong_ids or not wrong_ids])
+        current_app.logger.info('POST /orders: %d rows inserted, %.0f rows/s', count, speed)
+        return ids_response('orders', validated, 201)
+
+
+class OrdersStreamResource(Resource):
+    def post(self):
+        session = db_session.create_session()
+        try:
+            return ingest_response(session, 'orders', validate_orders, insert_orders)
+        except ValueError:
+            abort(400)
 
 
 class OrdersAssignResource(Resource):
     def post(self):
         session = db_session.create_session()
-        assign_time = datetime.now().strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+        assign_datetime = datetime.now()
 
         if len(request.json) != 1 or list(request.json.keys())[0] != 'courier_id':
             abort(400)
@@ -53,39 +96,56 @@ class OrdersAssignResource(Resource):
         if not courier:
             abort(400)
 
-        orders = session.query(Order).filter(Order.delivery_id != None, Order.delivery_id == courier.delivery_now,
-                                             Order.is_complete == 0).all()
+        orders = current_orders(session, courier.delivery_now) if courier.delivery_now is not None else []
         if orders:
-            return make_response(jsonify({'orders': [{'id': id} for id in [order.order_id for order in orders]],
-                                          'assign_time': str(orders[0].delivery_orm)}))
-        orders = sorted(session.query(Order).filter(Order.delivery_id == None, Order.is_complete == 0).all(),
-                        key=lambda order: order.weight)
+            return json_response(assign_result([order_id for order_id, _ in orders], orders[0][1]))
         courier_regions = session.query(Region).filter(Region.courier_orm == courier).all()
-        courier_intervals = session.query(CourierInterval).filter(CourierInterval.courier_orm == courier).all()
-        courier_sum_weight = courier.sum_weight
-        courier_carrying = courier.courier_type_orm.carrying
-        orders_assign = []
-        for order in orders:
-            if check_order(order, courier_regions, courier_intervals, courier_sum_weight, courier_carrying):
-                try:
-                    orders_assign.append(order)
-                    courier_sum_weight += order.weight
-                except Exception:
-                    abort(400)
-        courier.sum_weight = courier_sum_weight
-        if orders_assign:
-            delivery = session.query(Delivery).filter(Delivery.id == courier.courier_id).first()
-            delivery.assign_time = assign_time
-            delivery.courier_type = courier.courier_type_orm.title
-            courier.delivery_now = delivery.id
-            if delivery.complete_time is None:
-                delivery.complete_time = assign_time
-            for order in orders_assign:
-                order.delivery_id = delivery.id
-            session.commit()
-            return make_response(jsonify({'orders': [{'id': id} for id in [order.order_id for order in orders_assign]],
-                                          'assign_time': assign_time}), 200)
-        return make_response(jsonify({'orders': []}), 200)
+        with order_index.lock:
+            order_index.sync(session, [region.number_region for region in courier_regions])
+            orders_assign = select_orders(courier, courier_regions)
+        orders_assign = save_assignments(session, [(courier, orders_assign)], assign_datetime)[0][1]
+        courier_cache.bump([courier.courier_id])
+        if not orders_assign:
+            orders = current_orders(session, courier.courier_id)
+            if orders:
+                return json_response(assign_result([order_id for order_id, _ in orders], orders[0][1]))
+        return json_response(assign_result([order.order_id for order in orders_assign], assign_datetime))
+
+
+class OrdersAssignBatchResource(Resource):
+    def post(self):
+        session = db_session.create_session()
+        assign_datetime = datetime.now()
+
+        if any(key != 'courier_ids' for key in request.json):
+            abort(400)
+        couriers = session.query(Courier).options(selectinload(Courier.regions_orm),
+                                                  selectinload(Courier.working_hours_orm))
+        if 'courier_ids' in request.json:
+            courier_ids = request.json['courier_ids']
+            if not isinstance(courier_ids, list) or not all(isinstance(id, int) for id in courier_ids):
+                abort(400)
+            couriers = couriers.filter(Courier.courier_id.in_(courier_ids))
+        couriers = couriers.order_by(Courier.courier_id).all()
+        if 'courier_ids' in request.json and len(couriers) != len(set(request.json['courier_ids'])):
+            abort(400)
+
+        busy = {id for id, in session.query(Order.delivery_id).filter(
+            Order.delivery_id != None, Order.is_complete == 0).distinct()}
+        assignments = []
+        with order_index.lock:
+            order_index.sync(session, {region.number_region for courier in couriers for region in courier.regions_orm})
+            for courier in couriers:
+                if courier.delivery_now in busy:
+                    continue
+                orders_assign = select_orders(courier, courier.regions_orm)
+                if orders_assign:
+                    assignments.append((courier, orders_assign))
+        courier_ids = [courier.courier_id for courier, _ in assignments]
+        assignments = [(courier_id, [order.order_id for order in orders_assign]) for courier_id, (_, orders_assign)
+                       in zip(courier_ids, save_assignments(session, assignments, assign_datetime)) if orders_assign]
+        courier_cache.bump(courier_id for courier_id, _ in assignments)
+        return json_response(batch_assign_result(assignments, assign_datetime))
 
 
 class OrderCompleteResource(Resource):
@@ -103,26 +163,23 @@ class OrderCompleteResource(Resource):
             abort(400)
 
         if not order.is_complete:
-            try:
-                time_complete = datetime.strptime(request.json['complete_time'], '%Y-%m-%dT%H:%M:%S.%fZ')
-                time_delivery = courier.delivery_orm.complete_time
-                delivery_time = (time_complete - time_delivery).total_seconds()
-
-                order.is_complete = True
-                courier.sum_weight -= order.weight
-                region = session.query(Region).filter(Region.number_region == order.region,
-                                                      Region.courier_orm == courier).first()
-                region.orders_count += 1
-                region.sum_time += delivery_time
-                courier.delivery_orm.complete_time = request.json['complete_time']
-            except Exception:
-                abort(400)
-            session.commit()
-            delivery_orders = session.query(Order).filter(Order.delivery_orm == courier.delivery_orm,
-                                                          Order.is_complete == 0).all()
-
-            if not delivery_orders:
-                courier.earnings += 500 * courier.delivery_orm.courier_type_orm.coefficient
+            if completion_queue.enabled:
+                session.close()
+                try:
+                    completion_queue.submit(courier.courier_id, order.order_id, request.json['complete_time']).result(
+                        timeout=completion_queue.timeout)
+                except INVALID:
+                    abort(400)
+                except Exception:
+                    current_app.logger.exception('POST /orders/complete: group commit failed')
+                    abort(503)
+            else:
+                try:
+                    complete_order(session, courier, order, request.json['complete_time'])
+                except Exception:
+                    abort(400)
                 session.commit()
+                order_index.remove([order.order_id])
+                courier_cache.bump([courier.courier_id])
 
-        return make_response(jsonify({'order_id': order.order_id}))
+        return json_response(order_complete_result(order.order_id))
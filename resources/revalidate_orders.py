@@ -0,0 +1,80 @@
+from data.time_courier_intervals import CourierInterval
+from data.time_order_intervals import OrderInterval
+from data.availability import working_bitmap, delivery_bitmap, check_bitmaps
+from data.courier_types import courier_type_registry
+from data.time_intervals import parse_interval
+from collections import defaultdict
+from .order_index import OpenOrder
+from .check_ids import CHUNK_SIZE
+from data.regions import Region
+from data.orders import Order
+
+
+def update_regions(session, courier_id, numbers):
+    assert isinstance(numbers, list) and all(isinstance(number, int) for number in numbers)
+    old_numbers = {number for number, in session.query(Region.number_region).filter(Region.courier_id == courier_id)}
+    removed = old_numbers - set(numbers)
+    added = [number for number in numbers if number not in old_numbers]
+    if removed:
+        session.query(Region).filter(Region.courier_id == courier_id, Region.number_region.in_(removed)).delete(
+            synchronize_session=False)
+    if added:
+        session.execute(Region.__table__.insert(), [
+            {'courier_id': courier_id, 'number_region': number, 'orders_count': 0, 'sum_time': 0}
+            for number in added])
+    return removed
+
+
+def update_intervals(session, courier_id, intervals):
+    assert isinstance(intervals, list)
+    intervals = [parse_interval(interval) for interval in intervals]
+    old_intervals = {(time_start, time_end): id for id, time_start, time_end in session.query(
+        CourierInterval.id, CourierInterval.time_start, CourierInterval.time_end).filter(
+        CourierInterval.courier_id == courier_id)}
+    removed = [id for interval, id in old_intervals.items() if interval not in set(intervals)]
+    added = [interval for interval in intervals if interval not in old_intervals]
+    if removed:
+        session.query(CourierInterval).filter(CourierInterval.id.in_(removed)).delete(synchronize_session=False)
+    if added:
+        session.execute(CourierInterval.__table__.insert(), [
+            {'courier_id': courier_id, 'time_start': time_start, 'time_end': time_end}
+            for time_start, time_end in added])
+    return working_bitmap(intervals)
+
+
+def open_orders(session, delivery_id):
+    open_filter = (Order.delivery_id == delivery_id, Order.is_complete == 0)
+    orders = session.query(Order.order_id, Order.region, Order.weight, Order.delivery_bitmap).filter(
+        *open_filter).all()
+    intervals = defaultdict(list)
+    if any(bitmap is None for _, _, _, bitmap in orders):
+        for order_id, time_start, time_end in session.query(
+                OrderInterval.order_id, OrderInterval.time_start, OrderInterval.time_end).join(
+                Order, Order.order_id == OrderInterval.order_id).filter(Order.delivery_bitmap == None, *open_filter):
+            intervals[order_id].append((time_start, time_end))
+    return [OpenOrder(order_id, region, weight, delivery_bitmap(intervals[order_id]) if bitmap is None else bitmap)
+            for order_id, region, weight, bitmap in orders]
+
+
+def revalidate_orders(session, courier, removed_regions, old_bitmap, old_carrying):
+    carrying = courier_type_registry.get(courier.courier_type).carrying
+    check_hours = old_bitmap & ~courier.working_bitmap != 0
+    if courier.delivery_now is None or not (removed_regions or check_hours or carrying < old_carrying):
+        return []
+
+    regions = {number for number, in session.query(Region.number_region).filter(
+        Region.courier_id == courier.courier_id)}
+    sum_weight = 0
+    orders_unassign = []
+    for order in sorted(open_orders(session, courier.delivery_now), key=lambda order: order.weight):
+        if order.region not in regions or sum_weight + order.weight > carrying or \
+                check_hours and not check_bitmaps(courier.working_bitmap, order.delivery_bitmap):
+            orders_unassign.append(order)
+        else:
+            sum_weight += order.weight
+    order_ids = [order.order_id for order in orders_unassign]
+    for i in range(0, len(order_ids), CHUNK_SIZE):
+        session.query(Order).filter(Order.order_id.in_(order_ids[i:i + CHUNK_SIZE])).update(
+            {Order.delivery_id: None}, synchronize_session=False)
+    courier.sum_weight = sum_weight
+    return orders_unassign
@@ -0,0 +1,85 @@
+from data.time_intervals import format_interval
+from collections.abc import Hashable
+from flask import Response
+import json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+STREAM_THRESHOLD = 10000
+STREAM_CHUNK = 5000
+TIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
+
+
+def dumps(data):
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(data, separators=(',', ':')).encode() + b'\n'
+
+
+def json_response(body, status=200):
+    return Response(body, status, mimetype='application/json')
+
+
+def format_time(value):
+    return value.strftime(TIME_FORMAT)
+
+
+def id_items(ids):
+    return b','.join(b'{"id":%d}' % id for id in ids)
+
+
+def stream_ids(key, ids):
+    yield b'{"%s":[' % key.encode()
+    for i in range(0, len(ids), STREAM_CHUNK):
+        yield (b',' if i else b'') + id_items(ids[i:i + STREAM_CHUNK])
+    yield b']}\n'
+
+
+def ids_response(key, ids, status=200):
+    if len(ids) > STREAM_THRESHOLD:
+        return json_response(stream_ids(key, ids), status)
+    return json_response(b'{"%s":[%s]}\n' % (key.encode(), id_items(ids)), status)
+
+
+def unique_ids(ids):
+    seen, unique = set(), []
+    for id in ids:
+        id_key = (type(id), id if isinstance(id, Hashable) else repr(id))
+        if id_key not in seen:
+            seen.add(id_key)
+            unique.append(id)
+    return unique
+
+
+def validation_error_response(key, ids):
+    return json_response(dumps({'validation_error': {key: [{'id': id} for id in unique_ids(ids)]}}), 400)
+
+
+def courier_profile(courier_id, courier_type, regions, intervals, earnings=None, rating=None):
+    data = {'courier_id': courier_id, 'courier_type': courier_type}
+    if earnings is not None:
+        data['earnings'] = earnings
+    if rating is not None:
+        data['rating'] = rating
+    data['regions'] = regions
+    data['working_hours'] = [format_interval(time_start, time_end) for time_start, time_end in intervals]
+    return dumps(data)
+
+
+def assign_result(order_ids, assign_time=None):
+    if not order_ids:
+        return b'{"orders":[]}\n'
+    return b'{"assign_time":%s,"orders":[%s]}\n' % (dumps(format_time(assign_time))[:-1], id_items(order_ids))
+
+
+def batch_assign_result(assignments, assign_time):
+    assign_time = dumps(format_time(assign_time))[:-1]
+    return b'{"couriers":[%s]}\n' % b','.join(
+        b'{"assign_time":%s,"id":%d,"orders":[%s]}' % (assign_time, courier_id, id_items(order_ids))
+        for courier_id, order_ids in assignments)
+
+
+def order_complete_result(order_id):
+    return b'{"order_id":%d}\n' % order_id
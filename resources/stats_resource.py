@@ -0,0 +1,20 @@
+from flask import jsonify, make_response, Response
+from data.metrics import metrics
+from flask_restful import Resource
+from .courier_cache import courier_cache
+from data import db_session
+
+
+class DatabaseStatsResource(Resource):
+    def get(self):
+        return make_response(jsonify(db_session.get_pool_metrics()))
+
+
+class CacheStatsResource(Resource):
+    def get(self):
+        return make_response(jsonify(courier_cache.get_metrics()))
+
+
+class MetricsResource(Resource):
+    def get(self):
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,72 @@
+from flask import Response, request, current_app, stream_with_context
+from sqlalchemy.exc import IntegrityError
+from .check_ids import check_ids
+from .serializers import dumps
+from os import environ
+import json
+
+CHUNK_SIZE = 1000
+
+
+def get_chunk_size():
+    size = request.args.get('chunk_size', environ.get('STREAM_CHUNK_SIZE', CHUNK_SIZE))
+    if not str(size).isdigit() or int(size) < 1:
+        raise ValueError(size)
+    return int(size)
+
+
+def read_chunks(stream, size):
+    chunk = []
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError:
+            item = None
+        chunk.append((number, item))
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def validate_chunk(session, chunk, keys, columns, make_rows, tables_count):
+    id_key = keys[0]
+    wrong_ids = check_ids(session, columns, [item.get(id_key) for _, item in chunk if isinstance(item, dict)])
+    rows = tuple([] for _ in range(tables_count))
+    accepted, rejected = [], []
+    for number, item in chunk:
+        if not isinstance(item, dict) or id_key not in item:
+            rejected.append({'line': number})
+            continue
+        try:
+            assert all(key in item for key in keys) and len(item) == len(keys)
+            assert item[id_key] not in wrong_ids
+            for table_rows, new_rows in zip(rows, make_rows(item)):
+                table_rows.extend(new_rows)
+            accepted.append(item[id_key])
+        except Exception:
+            rejected.append({'id': item[id_key]})
+    return rows, accepted, rejected
+
+
+def ingest(session, name, size, validate, insert):
+    for number, chunk in enumerate(read_chunks(request.stream, size), 1):
+        rows, accepted, rejected = validate(session, chunk)
+        if accepted:
+            try:
+                count, speed = insert(session, rows)
+                current_app.logger.info('POST /%s/stream: chunk %d, %d rows inserted, %.0f rows/s',
+                                        name, number, count, speed)
+            except IntegrityError:
+                session.rollback()
+                rejected.extend({'id': id} for id in accepted)
+                accepted = []
+        yield dumps({'chunk': number, 'accepted': [{'id': id} for id in accepted], 'rejected': rejected})
+
+
+def ingest_response(session, name, validate, insert):
+    return Response(stream_with_context(ingest(session, name, get_chunk_size(), validate, insert)),
+                    mimetype='application/x-ndjson')
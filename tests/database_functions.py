@@ -1,11 +1,15 @@
 from data.time_courier_intervals import CourierInterval
 from data.time_order_intervals import OrderInterval
 from data.db_session import SqlAlchemyBase
-from data.courier_types import CourierType
+from data.courier_types import CourierType, courier_type_registry
 from data.delivery import Delivery
 from data.couriers import Courier
 from data.regions import Region
+from resources.order_index import order_index
+from resources.courier_cache import courier_cache
 from data.orders import Order
+from contextlib import contextmanager
+from sqlalchemy import event
 
 
 def add_types(session):
@@ -19,6 +23,9 @@ def add_types(session):
 def reset_db(engine):
     SqlAlchemyBase.metadata.drop_all(engine)
     SqlAlchemyBase.metadata.create_all(engine)
+    order_index.reset()
+    courier_cache.reset()
+    courier_type_registry.reset()
 
 
 def add_couriers(session):
@@ -84,3 +91,34 @@ def add_orders(session):
     for chto_to in validated:
         session.add(chto_to)
     session.commit()
+
+
+def add_assigned_orders(session, first_id, count, delivery_id):
+    for order_id in range(first_id, first_id + count):
+        session.add(Order(order_id=order_id, weight=0.01, region=1, delivery_id=delivery_id))
+        session.add(OrderInterval(order_id=order_id, time_start='09:00-18:00', time_end='09:00-18:00'))
+    session.query(Courier).filter(Courier.courier_id == delivery_id).first().delivery_now = delivery_id
+    session.commit()
+
+
+@contextmanager
+def count_queries(*engines):
+    queries = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        queries.append(statement)
+
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield queries
+    finally:
+        for engine in engines:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@contextmanager
+def query_budget(budget, *engines):
+    with count_queries(*engines) as queries:
+        yield queries
+    assert len(queries) <= budget, f'{len(queries)} queries, budget {budget}:\n' + '\n'.join(queries)
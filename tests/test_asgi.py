@@ -0,0 +1,145 @@
+from tests.database_functions import reset_db, add_types, add_orders, add_couriers
+from urllib.parse import urlsplit
+from asgi import AsgiApp, build_environ
+from data import db_session
+from os.path import exists
+from os import mkdir
+from app import app
+import asyncio
+import io
+import time
+import re
+import json
+import pytest
+
+
+@pytest.fixture()
+def client():
+    if not exists('./db'):
+        mkdir('./db')
+    engine = db_session.global_init('./db/test_base.db')
+    app.config['TESTING'] = True
+    add_types(db_session.create_session())
+    add_orders(db_session.create_session())
+    add_couriers(db_session.create_session())
+    with app.test_client() as client:
+        yield client
+    reset_db(engine)
+
+
+def asgi_request(asgi_app, method, url, data=None, headers=(), body=b''):
+    url = urlsplit(url)
+    body = json.dumps(data).encode() if data is not None else body
+    headers = [(b'host', b'localhost'), *headers]
+    if data is not None:
+        headers += [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]
+    scope = {'type': 'http', 'http_version': '1.1', 'method': method, 'scheme': 'http', 'path': url.path,
+             'root_path': '', 'query_string': url.query.encode(), 'headers': headers,
+             'server': ('localhost', 80), 'client': ('127.0.0.1', 5000)}
+    chunks = [body[index:index + 7] for index in range(0, len(body), 7)] or [b'']
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': chunks.pop(0), 'more_body': bool(chunks)}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(asgi_app(scope, receive, send))
+    headers = dict((name.decode(), value.decode()) for name, value in messages[0]['headers'])
+    return messages[0]['status'], headers, b''.join(message.get('body', b'') for message in messages[1:])
+
+
+REQUESTS = [('GET', '/couriers/1', None), ('GET', '/couriers/abc', None),
+            ('PATCH', '/couriers/2', {'regions': [1, 2]}), ('PATCH', '/couriers/2', {'name': 'courier'}),
+            ('POST', '/couriers', {'data': [{'courier_id': 10, 'courier_type': 'foot', 'regions': [1],
+                                             'working_hours': ['10:00-12:00']}]}),
+            ('POST', '/couriers', {'data': [{'courier_id': 10}]}),
+            ('POST', '/orders', {'data': [{'order_id': 100, 'weight': 1, 'region': 1,
+                                           'delivery_hours': ['10:00-12:00']}]}),
+            ('POST', '/orders/assign', {'courier_id': 10}),
+            ('POST', '/orders/assign/batch', {}),
+            ('POST', '/orders/complete', {'courier_id': 10, 'order_id': 100,
+                                          'complete_time': '2021-01-10T10:33:01.42Z'}),
+            ('GET', '/couriers/10', None), ('GET', '/stats/cache', None)]
+
+
+def normalize(body):
+    return re.sub(rb'"assign_time":"[^"]*"', b'"assign_time":""', body)
+
+
+def replay(engine, send):
+    responses = [send(method, url, data) for method, url, data in REQUESTS]
+    reset_db(engine)
+    add_types(db_session.create_session(read_only=False))
+    add_orders(db_session.create_session(read_only=False))
+    add_couriers(db_session.create_session(read_only=False))
+    return responses
+
+
+def test_asgi_matches_wsgi(client):
+    asgi_app = AsgiApp(app, 2)
+    engine = db_session.global_init('./db/test_base.db')
+
+    def wsgi_send(method, url, data):
+        rv = client.open(url, method=method, json=data)
+        return rv.status_code, rv.headers['Content-Type'], normalize(rv.data)
+
+    def asgi_send(method, url, data):
+        status, headers, body = asgi_request(asgi_app, method, url, data)
+        return status, headers['content-type'], normalize(body)
+
+    assert replay(engine, asgi_send) == replay(engine, wsgi_send)
+    asgi_app.executor.shutdown()
+
+
+def test_asgi_streaming(client):
+    asgi_app = AsgiApp(app, 2)
+    body = b''.join(b'{"order_id": %d, "weight": 1, "region": 1, "delivery_hours": ["10:00-12:00"]}\n' % id
+                    for id in range(100, 130))
+    status, headers, data = asgi_request(asgi_app, 'POST', '/orders/stream?chunk_size=10', body=body)
+    assert status == 200 and headers['content-type'] == 'application/x-ndjson'
+    assert [len(json.loads(line)['accepted']) for line in data.splitlines()] == [10, 10, 10]
+    assert json.loads(data.splitlines()[-1])['accepted'][-1] == {'id': 129}
+    asgi_app.executor.shutdown()
+
+
+def test_asgi_etag(client):
+    asgi_app = AsgiApp(app, 2)
+    etag = client.get('/couriers/1').headers['ETag']
+    status, _, body = asgi_request(asgi_app, 'GET', '/couriers/1', headers=[(b'if-none-match', etag.encode())])
+    assert (status, body) == (304, b'')
+    asgi_app.executor.shutdown()
+
+
+def test_repeated_headers_are_joined():
+    headers = [(b'cookie', b'a=1'), (b'cookie', b'b=2'), (b'accept', b'text/html'), (b'accept', b'application/json')]
+    environ = build_environ({'method': 'GET', 'path': '/', 'headers': headers}, io.BytesIO())
+
+    assert environ['HTTP_COOKIE'] == 'a=1; b=2'
+    assert environ['HTTP_ACCEPT'] == 'text/html,application/json'
+
+
+def test_lifespan_shutdown_does_not_block_loop():
+    asgi_app = AsgiApp(lambda environ, start_response: [], max_workers=1)
+    asgi_app.executor.submit(time.sleep, 0.3)
+    messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+    sent, ticks = [], []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message['type'])
+
+    async def tick():
+        while len(sent) < 2:
+            ticks.append(1)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(asgi_app({'type': 'lifespan'}, receive, send), tick())
+
+    asyncio.run(main())
+    assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+    assert len(ticks) > 5
@@ -0,0 +1,50 @@
+from benchmarks.assign_workers import populate, assign, run
+from multiprocessing import get_context
+from tempfile import TemporaryDirectory
+from collections import Counter, defaultdict
+from os.path import join
+import sqlite3
+
+
+def test_parallel_workers_do_not_assign_order_twice():
+    with TemporaryDirectory() as directory:
+        db_file = join(directory, 'stress.db')
+        with get_context('spawn').Pool(1) as pool:
+            pool.apply(populate, (db_file, 200, 1000))
+        results = run(db_file, 200, 4)
+
+        connection = sqlite3.connect(db_file)
+        delivery_ids = dict(connection.execute('SELECT order_id, delivery_id FROM orders'))
+        weights = dict(connection.execute('SELECT order_id, weight FROM orders'))
+        sum_weights = dict(connection.execute('SELECT courier_id, sum_weight FROM couriers'))
+        connection.close()
+
+    reported = Counter(order_id for _, orders in results for order_id in orders)
+    assert reported and max(reported.values()) == 1
+    assert all(delivery_ids[order_id] == courier_id for courier_id, orders in results for order_id in orders)
+    assert {order_id for order_id, delivery_id in delivery_ids.items() if delivery_id is not None} == set(reported)
+    assert all(abs(sum_weights[courier_id] - sum(weights[order_id] for order_id in orders)) < 1e-6
+               for courier_id, orders in results)
+
+
+def test_parallel_assigns_of_same_courier_count_weight_once():
+    with TemporaryDirectory() as directory:
+        db_file = join(directory, 'stress.db')
+        with get_context('spawn').Pool(1) as pool:
+            pool.apply(populate, (db_file, 100, 500))
+        with get_context('spawn').Pool(4) as pool:
+            results = [result for results in pool.starmap(assign, [(db_file, range(1, 101))] * 4)
+                       for result in results]
+
+        connection = sqlite3.connect(db_file)
+        assigned = defaultdict(set)
+        for order_id, delivery_id in connection.execute('SELECT order_id, delivery_id FROM orders'):
+            assigned[delivery_id].add(order_id)
+        weights = dict(connection.execute('SELECT order_id, weight FROM orders'))
+        sum_weights = dict(connection.execute('SELECT courier_id, sum_weight FROM couriers'))
+        connection.close()
+
+    assert any(orders for _, orders in results)
+    assert all(set(orders) in (assigned[courier_id], set()) for courier_id, orders in results)
+    assert all(abs(sum_weights[courier_id] - sum(weights[order_id] for order_id in assigned[courier_id])) < 1e-6
+               for courier_id in range(1, 101))
@@ -0,0 +1,63 @@
+from tests.database_functions import reset_db, add_types
+from bulk_load import load, main
+from data.migrations import INDEXES
+from data import db_session
+from os.path import exists
+from os import mkdir
+from app import app
+import sqlite3
+import pytest
+import json
+
+TABLES = ('couriers', 'delivery', 'regions', 'courier_intervals', 'orders', 'order_intervals')
+COURIERS = [{'courier_id': 1, 'courier_type': 'foot', 'regions': [1, 12, 22], 'working_hours': ['11:35-14:05']},
+            {'courier_id': 2, 'courier_type': 'car', 'regions': [1], 'working_hours': ['09:00-18:00', '19:00-20:00']}]
+ORDERS = [{'order_id': 1, 'weight': 0.23, 'region': 12, 'delivery_hours': ['09:00-18:00']},
+          {'order_id': 2, 'weight': 15, 'region': 1, 'delivery_hours': ['09:00-12:00', '16:00-21:30']},
+          {'order_id': 3, 'weight': 0.01, 'region': 22, 'delivery_hours': []}]
+
+
+@pytest.fixture()
+def client():
+    if not exists('./db'):
+        mkdir('./db')
+    engine = db_session.global_init('./db/test_base.db')
+    app.config['TESTING'] = True
+    add_types(db_session.create_session())
+    with app.test_client() as client:
+        yield client
+    reset_db(engine)
+
+
+def dump(db_file):
+    connection = sqlite3.connect(db_file)
+    tables = {table: connection.execute(f'SELECT * FROM {table} ORDER BY 1').fetchall() for table in TABLES}
+    connection.close()
+    return tables
+
+
+def test_load_matches_api(client, tmp_path):
+    (tmp_path / 'couriers.jsonl').write_text('\n'.join(json.dumps(courier) for courier in COURIERS))
+    (tmp_path / 'orders.json').write_text(json.dumps({'data': ORDERS}))
+    db_file = str(tmp_path / 'loaded.db')
+    load(db_file, 'couriers', str(tmp_path / 'couriers.jsonl'))
+    load(db_file, 'orders', str(tmp_path / 'orders.json'), batch_size=2)
+    client.post('/couriers', json={'data': COURIERS})
+    client.post('/orders', json={'data': ORDERS})
+
+    assert dump(db_file) == dump('./db/test_base.db')
+    connection = sqlite3.connect(db_file)
+    assert {name for name, _, _ in INDEXES} <= {name for name, in connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert connection.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    connection.close()
+
+
+def test_load_rejects_invalid_rows(tmp_path):
+    orders = ORDERS + [{'order_id': 1, 'weight': 1, 'region': 1, 'delivery_hours': []},
+                       {'order_id': 4, 'weight': 100, 'region': 1, 'delivery_hours': []}]
+    (tmp_path / 'orders.jsonl').write_text('\n'.join(json.dumps(order) for order in orders))
+    db_file = str(tmp_path / 'loaded.db')
+
+    assert main(['orders', str(tmp_path / 'orders.jsonl'), '--db', db_file]) == 1
+    assert [row[0] for row in dump(db_file)['orders']] == [2, 3]
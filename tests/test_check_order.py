@@ -0,0 +1,61 @@
+from data.availability import working_bitmap, delivery_bitmap, check_bitmaps
+from benchmarks.check_intervals import check_intervals, merge_intervals
+from data.time_intervals import parse_interval
+from types import SimpleNamespace
+from random import Random
+
+
+def interval(value):
+    time_start, time_end = parse_interval(value)
+    return SimpleNamespace(time_start=time_start, time_end=time_end)
+
+
+def old_check_intervals(order_intervals, courier_intervals):
+    for courier_interval in courier_intervals:
+        for order_interval in order_intervals:
+            if set(range(courier_interval.time_start, courier_interval.time_end + 1)) & \
+                    set(range(order_interval.time_start - 1, order_interval.time_end)):
+                return True
+    return False
+
+
+def test_merge_intervals():
+    assert merge_intervals([(600, 700), (0, 10), (11, 20), (650, 800), (900, 800)]) == [[0, 20], [600, 800]]
+
+
+def test_boundaries():
+    courier = [interval('09:00-11:00')]
+    assert check_intervals([interval('11:00-12:00')], courier)
+    assert check_intervals([interval('11:01-12:00')], courier)
+    assert not check_intervals([interval('11:02-12:00')], courier)
+    assert check_intervals([interval('08:00-09:01')], courier)
+    assert not check_intervals([interval('08:00-09:00')], courier)
+    assert not check_intervals([interval('10:00-09:30')], courier)
+    assert not check_intervals([interval('10:00-11:00')], [interval('12:00-08:00')])
+    assert check_intervals([interval('00:00-00:01')], [interval('00:00-00:00')])
+    assert not check_intervals([], courier) and not check_intervals([interval('10:00-11:00')], [])
+
+
+def test_equivalence_with_set_intersection():
+    random = Random(0)
+    for limit in (30, 1440):
+        for _ in range(1000):
+            order_intervals = [SimpleNamespace(time_start=random.randrange(limit), time_end=random.randrange(limit))
+                               for _ in range(random.randrange(4))]
+            courier_intervals = [SimpleNamespace(time_start=random.randrange(limit), time_end=random.randrange(limit))
+                                 for _ in range(random.randrange(4))]
+            assert check_intervals(order_intervals, courier_intervals) == \
+                old_check_intervals(order_intervals, courier_intervals)
+
+
+def test_bitmaps_equivalence_with_set_intersection():
+    random = Random(1)
+    for limit in (30, 1440):
+        for _ in range(1000):
+            order_intervals = [SimpleNamespace(time_start=random.randrange(limit), time_end=random.randrange(limit))
+                               for _ in range(random.randrange(4))]
+            courier_intervals = [SimpleNamespace(time_start=random.randrange(limit), time_end=random.randrange(limit))
+                                 for _ in range(random.randrange(4))]
+            working = working_bitmap((interval.time_start, interval.time_end) for interval in courier_intervals)
+            delivery = delivery_bitmap((interval.time_start, interval.time_end) for interval in order_intervals)
+            assert check_bitmaps(working, delivery) == old_check_intervals(order_intervals, courier_intervals)
@@ -0,0 +1,56 @@
+from data.courier_types import CourierType, courier_type_registry
+from tests.database_functions import reset_db, add_types, count_queries
+from data.couriers import Courier
+from data import db_session
+from os.path import exists
+from os import mkdir
+import pytest
+
+
+@pytest.fixture()
+def session():
+    if not exists('./db'):
+        mkdir('./db')
+    engine = db_session.global_init('./db/test_base.db')
+    add_types(db_session.create_session())
+    yield db_session.create_session()
+    reset_db(engine)
+
+
+def test_lookups(session):
+    foot = courier_type_registry.get_by_title('foot')
+
+    assert (foot.title, foot.carrying, foot.coefficient) == ('foot', 10, 2)
+    assert courier_type_registry.get(foot.id) is foot
+    assert courier_type_registry.get_by_title('plane') is None
+    assert sorted(courier_type_registry.get_ids()) == ['bike', 'car', 'foot']
+
+
+def test_validation_without_queries(session):
+    courier_type_registry.load()
+    with count_queries(session.bind) as queries:
+        couriers = [Courier(courier_id=id, courier_type='bike') for id in range(100)]
+
+    assert not queries
+    assert couriers[0].courier_type == courier_type_registry.get_by_title('bike').id
+
+
+def test_refresh_after_commit(session):
+    courier_type_registry.load()
+    session.add(CourierType(title='plane', carrying=100, coefficient=20))
+
+    assert courier_type_registry.get_by_title('plane') is None
+    session.commit()
+    assert courier_type_registry.get_by_title('plane').carrying == 100
+
+    session.query(CourierType).filter(CourierType.title == 'plane').delete()
+    session.commit()
+    assert courier_type_registry.get_by_title('plane') is None
+
+
+def test_rollback_keeps_registry(session):
+    types = courier_type_registry.load()[0]
+    session.query(CourierType).delete()
+    session.rollback()
+
+    assert courier_type_registry.load()[0] is types
@@ -0,0 +1,116 @@
+from data.db_session import load_profile, load_pool, create_engine, PROFILES, POOL, READ_POOL
+from data.courier_types import CourierType
+from data import db_session
+from os.path import exists
+from json import dump
+from os import mkdir
+from app import app
+import pytest
+
+
+def test_default_profile(monkeypatch):
+    monkeypatch.delenv('DB_PROFILE', raising=False)
+    monkeypatch.delenv('DB_CONFIG', raising=False)
+
+    assert load_profile() == PROFILES['durable']
+    assert load_profile('fast') == PROFILES['fast']
+
+
+def test_profile_from_environment(monkeypatch, tmp_path):
+    config = tmp_path / 'db.json'
+    with open(config, 'w') as config_file:
+        dump({'profile': 'durable', 'pragmas': {'cache_size': -2000}}, config_file)
+    monkeypatch.setenv('DB_CONFIG', str(config))
+
+    assert load_profile() == {**PROFILES['durable'], 'cache_size': -2000}
+    monkeypatch.setenv('DB_PROFILE', 'fast')
+    assert load_profile() == {**PROFILES['fast'], 'cache_size': -2000}
+    monkeypatch.setenv('DB_PROFILE', 'kek')
+    with pytest.raises(Exception):
+        load_profile()
+
+
+def test_pragmas_applied_on_connect(tmp_path):
+    engine = create_engine(str(tmp_path / 'base.db'), 'fast')
+    with engine.connect() as connection:
+        assert connection.execute('PRAGMA journal_mode').scalar() == 'wal'
+        assert connection.execute('PRAGMA synchronous').scalar() == 1
+        assert connection.execute('PRAGMA temp_store').scalar() == 2
+        assert connection.execute('PRAGMA busy_timeout').scalar() == 5000
+
+
+def test_global_engine_uses_wal():
+    if not exists('./db'):
+        mkdir('./db')
+    engine = db_session.global_init('./db/test_base.db')
+    with engine.connect() as connection:
+        assert connection.execute('PRAGMA journal_mode').scalar() == 'wal'
+
+
+def test_read_engine_is_query_only():
+    if not exists('./db'):
+        mkdir('./db')
+    db_session.global_init('./db/test_base.db')
+    with db_session.get_engine(read_only=True).connect() as connection:
+        assert connection.execute('PRAGMA journal_mode').scalar() == 'wal'
+        assert connection.execute('PRAGMA query_only').scalar() == 1
+        with pytest.raises(Exception):
+            connection.execute('CREATE TABLE kek (id INTEGER)')
+    with db_session.get_engine().connect() as connection:
+        assert connection.execute('PRAGMA query_only').scalar() == 0
+
+
+def test_get_requests_use_read_engine():
+    db_session.global_init('./db/test_base.db')
+    with app.test_request_context('/couriers/1'):
+        session = db_session.create_session()
+        assert session.bind is db_session.get_engine(read_only=True)
+        assert db_session.create_session() is session
+    with app.test_request_context('/couriers/1', method='PATCH'):
+        assert db_session.create_session().bind is db_session.get_engine()
+
+
+def test_get_request_session_rejects_writes():
+    db_session.global_init('./db/test_base.db')
+    with app.test_request_context('/couriers/1'):
+        session = db_session.create_session()
+        session.add(CourierType(title='kek', carrying=1, coefficient=1))
+        with pytest.raises(Exception, match='только для чтения'):
+            session.commit()
+        session.rollback()
+        session = db_session.create_session(read_only=False)
+        session.add(CourierType(title='kek', carrying=1, coefficient=1))
+        session.commit()
+        session.delete(session.query(CourierType).filter(CourierType.title == 'kek').first())
+        session.commit()
+
+
+def test_read_pool_from_environment(monkeypatch):
+    monkeypatch.setenv('DB_READ_POOL_SIZE', '3')
+    monkeypatch.setenv('DB_POOL_SIZE', '7')
+
+    assert load_pool(read_only=True) == {**READ_POOL, 'pool_size': 3}
+    assert load_pool() == {**POOL, 'pool_size': 7}
+
+
+def test_close_session_rolls_back_on_exception(monkeypatch):
+    db_session.global_init('./db/test_base.db')
+    calls = []
+    with app.test_request_context('/couriers/1', method='PATCH'):
+        session = db_session.create_session()
+        monkeypatch.setattr(session, 'rollback', lambda: calls.append('rollback'))
+        monkeypatch.setattr(session, 'close', lambda: calls.append('close'))
+        db_session.close_session(ValueError())
+    with app.test_request_context('/couriers/1', method='PATCH'):
+        session = db_session.create_session()
+        monkeypatch.setattr(session, 'rollback', lambda: calls.append('rollback'))
+        monkeypatch.setattr(session, 'close', lambda: calls.append('close'))
+        db_session.close_session()
+
+    assert calls == ['rollback', 'close', 'close']
+
+
+def test_old_sqlite_is_rejected():
+    db_session.check_sqlite_version((3, 40, 1))
+    with pytest.raises(Exception, match='3.35.0'):
+        db_session.check_sqlite_version((3, 34, 1))
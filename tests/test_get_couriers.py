@@ -1,8 +1,14 @@
-from tests.database_functions import reset_db, add_types, add_orders, add_couriers
-from datetime import datetime
+from tests.database_functions import reset_db, add_types, add_orders, add_couriers, count_queries
+from resources.courier_cache import CourierCache, courier_cache
+from data.migrations import backfill_ratings
+from data.rating import get_rating
+from data.couriers import Courier
+from data.regions import Region
+from datetime import datetime, timedelta
 from data.orders import Order
 from data import db_session
 from os.path import exists
+from json import loads
 from os import mkdir
 from app import app
 import pytest
@@ -50,3 +56,116 @@ def test_wrong_courier_id(client):
 
     assert rv.status_code == 400
     assert rv.data == b'{"message": "The browser (or proxy) sent a request that this server could not understand."}\n'
+
+
+def test_rating_stored_on_complete(client):
+    client.post('/orders/assign', json={'courier_id': 1})
+    client.post('/orders/complete', json={'courier_id': 1, 'order_id': 1,
+                                          'complete_time': datetime.now().strftime('%Y-%m-%dT%H:%M:%S.%fZ')})
+    session = db_session.create_session()
+    courier = session.query(Courier).filter(Courier.courier_id == 1).first()
+
+    assert courier.min_delivery_time is not None and courier.min_delivery_time < 60
+    assert courier.rating == get_rating(courier.min_delivery_time)
+
+
+def test_rating_after_removing_region(client):
+    assign_time = datetime.strptime(client.post('/orders/assign', json={'courier_id': 1}).json['assign_time'],
+                                    '%Y-%m-%dT%H:%M:%S.%fZ')
+    for order_id, seconds in ((1, 600), (3, 2400)):
+        client.post('/orders/complete', json={'courier_id': 1, 'order_id': order_id, 'complete_time': (
+            assign_time + timedelta(seconds=seconds)).strftime('%Y-%m-%dT%H:%M:%S.%fZ')})
+    assert loads(client.get('/couriers/1').data)['rating'] == 4.17
+
+    client.patch('/couriers/1', json={'regions': [1, 22]})
+    regions = db_session.create_session(read_only=False).query(Region).filter(Region.courier_id == 1).all()
+    min_delivery_time = min([60 * 60] + [region.sum_time / region.orders_count
+                                         for region in regions if region.orders_count])
+
+    assert loads(client.get('/couriers/1').data)['rating'] == round((60 * 60 - min_delivery_time) / 60 / 60 * 5, 2)
+    assert loads(client.get('/couriers/1').data)['rating'] == 2.5
+
+
+def test_backfill_ratings(client):
+    session = db_session.create_session()
+    region = session.query(Region).filter(Region.courier_id == 1, Region.number_region == 12).first()
+    region.orders_count, region.sum_time = 2, 1800
+    session.query(Courier).filter(Courier.courier_id == 1).first().earnings = 1000
+    session.commit()
+    with session.bind.begin() as connection:
+        backfill_ratings(connection)
+    rv = client.get('/couriers/1')
+
+    assert loads(rv.data)['rating'] == 3.75
+    assert db_session.create_session().query(Courier).filter(Courier.courier_id == 2).first().rating == 0
+
+
+def test_not_modified_checks_only_version(client):
+    rv = client.get('/couriers/1')
+    with count_queries(db_session.get_engine(), db_session.get_engine(read_only=True)) as queries:
+        rv_cached = client.get('/couriers/1', headers={'If-None-Match': rv.headers['ETag']})
+
+    assert rv.headers['ETag'] and rv_cached.status_code == 304 and not rv_cached.data
+    assert rv_cached.headers['ETag'] == rv.headers['ETag']
+    assert len(queries) == 1
+    assert queries[0].startswith('SELECT couriers.version AS couriers_version \nFROM couriers')
+
+
+def test_cache_follows_database_version(client, monkeypatch):
+    etag = client.get('/couriers/1').headers['ETag']
+    courier_cache.reset()
+    assert client.get('/couriers/1').headers['ETag'] == etag
+
+    monkeypatch.setattr(courier_cache, 'bump', lambda courier_ids: None)
+    client.patch('/couriers/1', json={'regions': [12, 22]})
+    rv = client.get('/couriers/1', headers={'If-None-Match': etag})
+    assert rv.status_code == 200 and loads(rv.data)['regions'] == [12, 22]
+
+    etag = rv.headers['ETag']
+    client.post('/orders/assign', json={'courier_id': 1})
+    assert client.get('/couriers/1', headers={'If-None-Match': etag}).status_code == 304
+    for order_id in (3, 1):
+        client.post('/orders/complete', json={'courier_id': 1, 'order_id': order_id,
+                                              'complete_time': '2021-01-10T10:33:01.42Z'})
+    rv = client.get('/couriers/1', headers={'If-None-Match': etag})
+    assert rv.status_code == 200 and 'rating' in loads(rv.data)
+
+
+def test_two_caches_share_database_version(client):
+    first, second = CourierCache(), CourierCache()
+    first.put(1, 0, b'old')
+    second.put(1, 0, b'old')
+    first.put(1, 1, b'new')
+
+    assert second.get(1, 1) is None
+    assert first.get(1, 0) is None and second.get(1, 0) is None
+
+
+def test_etag_changes_after_update(client):
+    etag = client.get('/couriers/1').headers['ETag']
+    client.patch('/couriers/1', json={'regions': [1]})
+    rv = client.get('/couriers/1', headers={'If-None-Match': etag})
+
+    assert rv.status_code == 200 and rv.headers['ETag'] != etag
+    assert loads(rv.data)['regions'] == [1]
+
+
+def test_cache_counters(client):
+    before = loads(client.get('/stats/cache').data)
+    client.get('/couriers/2')
+    client.get('/couriers/2')
+    after = loads(client.get('/stats/cache').data)
+
+    assert after['misses'] - before['misses'] == 1
+    assert after['hits'] - before['hits'] == 1
+
+
+def test_cache_evicts_least_recently_used():
+    cache = CourierCache(size=2)
+    for courier_id in (1, 2):
+        cache.put(courier_id, 0, b'{"courier_id":%d}' % courier_id)
+    cache.get(1, 0)
+    cache.put(3, 0, b'{"courier_id":3}')
+
+    assert list(cache.entries) == [1, 3]
+    assert cache.get_metrics()['evictions'] == 1
@@ -0,0 +1,55 @@
+from tests.database_functions import reset_db, add_types, add_orders, add_couriers
+from data.metrics import metrics
+from data import db_session
+from os.path import exists
+from os import mkdir
+from app import app
+import pytest
+
+
+@pytest.fixture()
+def client():
+    if not exists('./db'):
+        mkdir('./db')
+    engine = db_session.global_init('./db/test_base.db')
+    app.config['TESTING'] = True
+    add_types(db_session.create_session())
+    add_orders(db_session.create_session())
+    add_couriers(db_session.create_session())
+    metrics.reset()
+    with app.test_client() as client:
+        yield client
+    reset_db(engine)
+
+
+def parse(text):
+    return {line.rsplit(' ', 1)[0]: float(line.rsplit(' ', 1)[1])
+            for line in text.splitlines() if not line.startswith('#')}
+
+
+def test_metrics_per_endpoint(client):
+    client.post('/orders/assign', json={'courier_id': 1})
+    client.post('/orders/assign', json={'courier_id': 5})
+    client.get('/couriers/1')
+    rv = client.get('/metrics')
+    values = parse(rv.data.decode())
+
+    assert rv.status_code == 200 and rv.mimetype == 'text/plain'
+    assert values['http_requests_total{endpoint="OrdersAssignResource",method="POST",status="200"}'] == 1
+    assert values['http_requests_total{endpoint="OrdersAssignResource",method="POST",status="400"}'] == 1
+    assert values['http_request_duration_seconds_count{endpoint="OrdersAssignResource",method="POST"}'] == 2
+    assert values['http_request_duration_seconds_bucket{endpoint="OrdersAssignResource",method="POST",le="+Inf"}'] \
+        == 2
+    assert values['sql_statements_total{endpoint="CouriersResource"}'] == 3
+    assert values['sql_rows_total{endpoint="CouriersResource"}'] == 1 + 3 + 2
+    assert values['sql_duration_seconds_total{endpoint="OrdersAssignResource"}'] > 0
+
+
+def test_metrics_histogram_is_cumulative(client):
+    for _ in range(3):
+        client.get('/couriers/2')
+    values = parse(client.get('/metrics').data.decode())
+    buckets = [value for key, value in values.items()
+               if key.startswith('http_request_duration_seconds_bucket{endpoint="CouriersResource"')]
+
+    assert buckets == sorted(buckets) and buckets[-1] == 3
@@ -0,0 +1,47 @@
+from tests.database_functions import reset_db, add_types, add_orders, add_couriers
+from data import db_session
+from os.path import exists
+from json import loads
+from os import mkdir
+from app import app
+import pytest
+
+
+@pytest.fixture()
+def client():
+    if not exists('./db'):
+        mkdir('./db')
+    engine = db_session.global_init('./db/test_base.db')
+    app.config['TESTING'] = True
+    add_types(db_session.create_session())
+    add_orders(db_session.create_session())
+    add_couriers(db_session.create_session())
+    with app.test_client() as client:
+        yield client
+    reset_db(engine)
+
+
+def test_one_session_per_request(client):
+    before = loads(client.get('/stats/db').data)
+    client.post('/orders/assign', json={'courier_id': 1})
+    client.patch('/couriers/1', json={'regions': [1, 12]})
+    client.get('/couriers/1')
+    rv = client.get('/stats/db')
+    after = loads(rv.data)
+
+    assert rv.status_code == 200
+    assert after['sessions'] - before['sessions'] == 2
+    assert after['read']['sessions'] - before['read']['sessions'] == 1
+    assert after['open_sessions'] == after['read']['open_sessions'] == 0
+    assert after['checkouts'] >= after['checkins'] >= before['checkins']
+    assert after['pool_size'] == db_session.POOL['pool_size']
+    assert after['read']['pool_size'] == db_session.READ_POOL['pool_size']
+    assert after['wait_time_max'] >= 0
+
+
+def test_session_shared_inside_request():
+    with app.app_context():
+        session = db_session.create_session()
+        assert db_session.create_session() is session
+    with app.app_context():
+        assert db_session.create_session() is not session
@@ -0,0 +1,125 @@
+from tests.database_functions import reset_db, add_types, add_orders, add_couriers
+from resources.complete_orders import CompletionQueue
+from resources import order_resource
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from resources.courier_cache import courier_cache
+from data.metrics import metrics
+from data.couriers import Courier
+from data.orders import Order
+from datetime import datetime
+from data import db_session
+from os.path import exists
+from os import mkdir
+from app import app
+import pytest
+
+
+@pytest.fixture()
+def client(monkeypatch):
+    if not exists('./db'):
+        mkdir('./db')
+    engine = db_session.global_init('./db/test_base.db')
+    app.config['TESTING'] = True
+    add_types(db_session.create_session())
+    add_orders(db_session.create_session())
+    add_couriers(db_session.create_session())
+    monkeypatch.setattr(order_resource, 'completion_queue', CompletionQueue(True, window=200))
+    metrics.reset()
+    with app.test_client() as client:
+        yield client
+    reset_db(engine)
+
+
+def complete(courier_id, order_id, complete_time=None):
+    with app.test_client() as client:
+        return client.post('/orders/complete', json={
+            'courier_id': courier_id, 'order_id': order_id,
+            'complete_time': complete_time or datetime.now().strftime('%Y-%m-%dT%H:%M:%S.%fZ')})
+
+
+def test_group_commit_complete(client):
+    client.post('/orders', json={'data': [{'order_id': 4, 'weight': 1, 'region': 1,
+                                           'delivery_hours': ['09:00-18:00']}]})
+    client.post('/orders/assign', json={'courier_id': 1})
+    client.post('/orders/assign', json={'courier_id': 2})
+    with ThreadPoolExecutor(4) as executor:
+        responses = list(executor.map(complete, [1, 1, 2, 1], [3, 1, 2, 4], [None, None, None, 'yesterday']))
+    session = db_session.create_session(read_only=False)
+
+    assert [rv.status_code for rv in responses] == [200, 200, 200, 400]
+    assert [rv.data for rv in responses[:3]] == [b'{"order_id":3}\n', b'{"order_id":1}\n', b'{"order_id":2}\n']
+    assert [order.order_id for order in session.query(Order).filter(Order.is_complete == 0)] == [4]
+    assert [courier.earnings for courier in session.query(Courier).order_by(Courier.courier_id)] == [0, 2500, 0]
+    assert 'group_commit_batch_size_count 1\n' in metrics.render()
+    assert 'group_commit_latency_seconds_count 4\n' in metrics.render()
+
+
+def test_group_commit_rejects(client):
+    client.post('/orders/assign', json={'courier_id': 1})
+
+    assert complete(1, 2).status_code == 400
+    assert complete(1, 3, '10:00').status_code == 400
+    assert complete(1, 3).status_code == 200
+    assert client.get('/couriers/1').json['earnings'] == 0
+
+
+def test_group_commit_database_error(client, monkeypatch):
+    client.post('/orders/assign', json={'courier_id': 1})
+    client.post('/orders/assign', json={'courier_id': 2})
+    queue = CompletionQueue(True, window=1)
+    complete_time = datetime.now().strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+    commit = Session.commit
+
+    def fail_once(session):
+        monkeypatch.setattr(Session, 'commit', commit)
+        raise OperationalError('COMMIT', {}, Exception('database is locked'))
+
+    monkeypatch.setattr(Session, 'commit', fail_once)
+    with pytest.raises(OperationalError):
+        queue.submit(1, 3, complete_time).result(timeout=5)
+
+    assert queue.thread.is_alive()
+    assert queue.submit(2, 2, complete_time).result(timeout=5) == 2
+    assert queue.thread.is_alive()
+    session = db_session.create_session(read_only=False)
+    assert [order.order_id for order in session.query(Order).filter(Order.is_complete == 0)] == [1, 3]
+    assert client.get('/couriers/2').json['earnings'] == 2500
+
+
+def test_group_commit_error_after_commit(client, monkeypatch):
+    client.post('/orders/assign', json={'courier_id': 1})
+    client.post('/orders/assign', json={'courier_id': 2})
+    queue = CompletionQueue(True, window=1)
+    complete_time = datetime.now().strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+    bump = courier_cache.bump
+
+    def fail_once(courier_ids):
+        monkeypatch.setattr(courier_cache, 'bump', bump)
+        raise RuntimeError('cache')
+
+    monkeypatch.setattr(courier_cache, 'bump', fail_once)
+
+    assert queue.submit(1, 3, complete_time).result(timeout=5) == 3
+    assert queue.thread.is_alive()
+    assert queue.submit(2, 2, complete_time).result(timeout=5) == 2
+
+
+def test_group_commit_failures_return_503(client, monkeypatch):
+    client.post('/orders/assign', json={'courier_id': 1})
+    queue = order_resource.completion_queue
+    commit = Session.commit
+
+    def fail_once(session):
+        monkeypatch.setattr(Session, 'commit', commit)
+        raise OperationalError('COMMIT', {}, Exception('database is locked'))
+
+    monkeypatch.setattr(Session, 'commit', fail_once)
+    assert complete(1, 3).status_code == 503
+
+    monkeypatch.setattr(queue, 'timeout', 0.01)
+    monkeypatch.setattr(queue, 'window', 0.5)
+    assert complete(1, 3).status_code == 503
+    monkeypatch.setattr(queue, 'timeout', 5)
+    assert complete(1, 1).status_code == 200
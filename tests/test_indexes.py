@@ -0,0 +1,50 @@
+from data.time_courier_intervals import CourierInterval
+from data.time_order_intervals import OrderInterval
+from data.migrations import get_version, MIGRATIONS
+from tests.database_functions import reset_db
+from data.regions import Region
+from data.orders import Order
+from data import db_session
+from os.path import exists
+from os import mkdir
+import pytest
+
+
+@pytest.fixture()
+def session():
+    if not exists('./db'):
+        mkdir('./db')
+    engine = db_session.global_init('./db/test_base.db')
+    yield db_session.create_session()
+    reset_db(engine)
+
+
+def query_plan(session, query):
+    sql = str(query.statement.compile(session.bind, compile_kwargs={'literal_binds': True}))
+    return ' '.join(row[3] for row in session.execute('EXPLAIN QUERY PLAN ' + sql))
+
+
+def test_schema_version(session):
+    assert get_version(session.connection()) == len(MIGRATIONS)
+
+
+@pytest.mark.parametrize('query, index', [
+    (lambda session: session.query(Order).filter(Order.delivery_id != None, Order.delivery_id == 1,
+                                                 Order.is_complete == 0), 'ix_orders_delivery_id_is_complete'),
+    (lambda session: session.query(Order.order_id).filter(Order.delivery_id == None, Order.is_complete == 0),
+     'ix_orders_delivery_id_is_complete'),
+    (lambda session: session.query(Order).filter(Order.region.in_([1, 12]), Order.is_complete == 0,
+                                                 Order.weight <= 10), 'ix_orders_region_is_complete_weight'),
+    (lambda session: session.query(Region).filter(Region.courier_id == 1), 'ix_regions_courier_id_number_region'),
+    (lambda session: session.query(Region).filter(Region.number_region == 12, Region.courier_id == 1),
+     'ix_regions_courier_id_number_region'),
+    (lambda session: session.query(CourierInterval).filter(CourierInterval.courier_id == 1),
+     'ix_courier_intervals_courier_id'),
+    (lambda session: session.query(OrderInterval).filter(OrderInterval.order_id.in_([1, 2, 3])),
+     'ix_order_intervals_order_id'),
+])
+def test_hot_queries_use_indexes(session, query, index):
+    plan = query_plan(session, query(session))
+
+    assert f'INDEX {index}' in plan
+    assert 'SCAN' not in plan
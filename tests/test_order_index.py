@@ -0,0 +1,42 @@
+from resources.order_index import OrderIndex, OpenOrder
+
+
+def make_index(orders):
+    index = OrderIndex()
+    index.loaded = True
+    index.add(orders)
+    return index
+
+
+def test_candidates_sorted_by_weight_in_regions():
+    index = make_index([OpenOrder(1, 1, 5, 0), OpenOrder(2, 2, 0.5, 0), OpenOrder(3, 1, 0.5, 0),
+                        OpenOrder(4, 3, 0.1, 0), OpenOrder(5, 2, 12, 0)])
+
+    assert [order.order_id for order in index.candidates([1, 2], 10)] == [2, 3, 1]
+    assert [order.order_id for order in index.candidates([2, 2, 4], 50)] == [2, 5]
+    assert list(index.candidates([5], 50)) == []
+
+
+def test_add_and_remove():
+    index = make_index([OpenOrder(1, 1, 5, 0), OpenOrder(2, 1, 0.5, 0)])
+    index.add([OpenOrder(1, 1, 5, 0), OpenOrder(3, 1, 1, 0)])
+    index.remove([2, 4])
+
+    assert [order.order_id for order in index.candidates([1], 50)] == [3, 1]
+    assert sorted(index.orders) == [1, 3]
+
+
+def test_add_before_load_is_ignored():
+    index = OrderIndex()
+    index.add([OpenOrder(1, 1, 5, 0)])
+
+    assert index.orders == {}
+
+
+def test_add_skips_unloaded_partitions():
+    index = OrderIndex(partitions=4)
+    index.partitions = {1}
+    index.add([OpenOrder(1, 1, 5, 0), OpenOrder(2, 2, 1, 0), OpenOrder(3, 5, 1, 0)])
+
+    assert sorted(index.orders) == [1, 3]
+    assert index.is_loaded(9) and not index.is_loaded(2)
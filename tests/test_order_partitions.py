@@ -0,0 +1,92 @@
+from tests.database_functions import reset_db, add_types, add_couriers, count_queries
+from resources.order_index import order_index
+from data import db_session
+from os.path import exists
+from os import mkdir
+from app import app
+import pytest
+
+
+@pytest.fixture()
+def client():
+    if not exists('./db'):
+        mkdir('./db')
+    engine = db_session.global_init('./db/test_base.db')
+    app.config['TESTING'] = True
+    add_types(db_session.create_session())
+    add_couriers(db_session.create_session())
+    db_session.init_partitions(engine, 4)
+    with app.test_client() as client:
+        client.post('/orders', json={'data': [
+            {'order_id': id, 'weight': 1, 'region': region, 'delivery_hours': ['09:00-18:00']}
+            for id, region in enumerate([1, 12, 22, 23, 33, 2, 5, 1, 12], 1)]})
+        order_index.reset()
+        yield client
+    db_session.init_partitions(engine, 0)
+    reset_db(engine)
+
+
+def test_assign_loads_courier_partitions(client):
+    rv = client.post('/orders/assign', json={'courier_id': 2})
+
+    assert [order['id'] for order in rv.json['orders']] == [1, 8]
+    assert order_index.partitions == {1} and not order_index.loaded
+    assert sorted(order_index.orders) == [5, 7]
+
+    rv = client.post('/orders/assign', json={'courier_id': 1})
+    assert [order['id'] for order in rv.json['orders']] == [2, 3, 9]
+    assert order_index.partitions == {0, 1, 2}
+    assert sorted(order_index.orders) == [5, 6, 7]
+
+
+def test_partitions_follow_new_orders(client):
+    client.post('/orders/assign', json={'courier_id': 2})
+    client.post('/orders', json={'data': [
+        {'order_id': id, 'weight': 1, 'region': region, 'delivery_hours': ['09:00-18:00']}
+        for id, region in [(10, 1), (11, 3), (12, 9)]]})
+
+    assert sorted(order_index.orders) == [5, 7, 10, 12]
+    rv = client.post('/orders/assign/batch', json={'courier_ids': [3]})
+    assert rv.json['couriers'] == []
+    assert order_index.partitions == {0, 1, 2, 3} and 11 in order_index.orders
+
+
+def test_complete_after_partitioned_assign(client):
+    orders = client.post('/orders/assign', json={'courier_id': 2}).json['orders']
+    for order in orders:
+        rv = client.post('/orders/complete', json={'courier_id': 2, 'order_id': order['id'],
+                                                   'complete_time': '2021-01-10T10:33:01.42Z'})
+        assert rv.status_code == 200
+
+    assert client.get('/couriers/2').json['earnings'] == 2500
+
+
+def partition_ids(group):
+    session = db_session.create_session(read_only=False)
+    table = db_session.partition_table(group)
+    return sorted(order_id for order_id, in session.query(table.c.order_id))
+
+
+def test_open_orders_are_stored_by_group(client):
+    assert [partition_ids(group) for group in range(4)] == [[2, 9], [1, 5, 7, 8], [3, 6], [4]]
+    with count_queries(db_session.get_engine()) as queries:
+        client.post('/orders/assign', json={'courier_id': 2})
+
+    assert [query.split('FROM ')[1] for query in queries if query.startswith('SELECT open_orders_')] == \
+        ['open_orders_1']
+    assert not any(query.startswith('SELECT') and 'orders.delivery_id IS NULL' in query for query in queries)
+    assert partition_ids(1) == [5, 7]
+
+    client.patch('/couriers/2', json={'regions': [5]})
+    assert partition_ids(1) == [1, 5, 7, 8]
+    db_session.init_partitions(db_session.get_engine(), 4)
+    assert [partition_ids(group) for group in range(4)] == [[2, 9], [1, 5, 7, 8], [3, 6], [4]]
+
+
+def test_bulk_post_is_atomic_across_groups(client):
+    rv = client.post('/orders', json={'data': [
+        {'order_id': id, 'weight': 1, 'region': region, 'delivery_hours': ['09:00-18:00']}
+        for id, region in [(10, 1), (11, 2), (1, 3)]]})
+
+    assert rv.status_code == 400
+    assert [partition_ids(group) for group in range(4)] == [[2, 9], [1, 5, 7, 8], [3, 6], [4]]
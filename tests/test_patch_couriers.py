@@ -1,5 +1,6 @@
-from tests.database_functions import reset_db, add_types, add_couriers, add_orders
+from tests.database_functions import reset_db, add_types, add_couriers, add_orders, add_assigned_orders, count_queries
 from data.time_courier_intervals import CourierInterval
+from data.availability import working_bitmap
 from data.couriers import Courier
 from data.regions import Region
 from data.orders import Order
@@ -68,6 +69,15 @@ def test_success_edit_regions(client):
     assert courier is not None and sorted(courier_regions) == sorted(json['regions'])
 
 
+def test_duplicates_are_kept_as_sent(client):
+    rv = client.patch('/couriers/1', json={'regions': [12, 33, 33], 'working_hours': ['09:00-11:00', '16:00-17:00',
+                                                                                      '16:00-17:00']})
+
+    assert rv.status_code == 200
+    assert rv.data == b'{"courier_id":1,"courier_type":"foot","regions":[12,33,33],' \
+                      b'"working_hours":["09:00-11:00","16:00-17:00","16:00-17:00"]}\n'
+
+
 def test_success_edit_working_hours(client):
     json = {"working_hours": ["11:20-14:05"]}
     rv = client.patch('/couriers/1', json=json)
@@ -78,6 +88,7 @@ def test_success_edit_working_hours(client):
     assert rv.data == b'{"courier_id":1,"courier_type":"foot","regions":[1,12,22],"working_hours":["11:20-14:05"]}\n'
     c_hours = [str(i) for i in session.query(CourierInterval).filter(CourierInterval.courier_orm == courier).all()]
     assert courier is not None and sorted(c_hours) == sorted(json['working_hours'])
+    assert courier.working_bitmap == working_bitmap([(11 * 60 + 20, 14 * 60 + 5)])
 
 
 def test_success_edit_courier(client):
@@ -198,3 +209,58 @@ def test_success_edit_courier_working_hours_unassign_orders(client):
     c_hours = [str(i) for i in session.query(CourierInterval).filter(CourierInterval.courier_orm == courier).all()]
     assert courier is not None and sorted(c_hours) == sorted(json['working_hours'])
     assert [order.order_id for order in session.query(Order).filter(Order.delivery_id == 1)] == []
+
+
+def test_queries_do_not_depend_on_orders_count(client):
+    engine = db_session.global_init('./db/test_base.db')
+    wide, narrow = {"working_hours": ["09:00-18:00", "19:00-20:00"]}, {"working_hours": ["09:00-18:00"]}
+    add_assigned_orders(db_session.create_session(), 10, 5, 2)
+    client.patch('/couriers/2', json=wide)
+    with count_queries(engine) as small_queries:
+        client.patch('/couriers/2', json=narrow)
+    add_assigned_orders(db_session.create_session(), 100, 100, 2)
+    client.patch('/couriers/2', json=wide)
+    with count_queries(engine) as large_queries:
+        rv = client.patch('/couriers/2', json=narrow)
+    session = db_session.create_session()
+
+    assert rv.status_code == 200
+    assert any('FROM orders' in query for query in large_queries)
+    assert len(small_queries) == len(large_queries)
+    assert len([order for order in session.query(Order).filter(Order.delivery_id == 2)]) == 105
+
+
+def test_loosened_constraints_skip_revalidation(client):
+    engine = db_session.global_init('./db/test_base.db')
+    client.post('/orders/assign', json={'courier_id': 1})
+    with count_queries(engine) as queries:
+        rv = client.patch('/couriers/1', json={"courier_type": "car", "regions": [1, 12, 22, 23],
+                                               "working_hours": ["11:35-14:05", "09:00-11:00", "20:00-21:00"]})
+    session = db_session.create_session()
+
+    assert rv.status_code == 200
+    assert not any('FROM orders' in query or 'UPDATE orders' in query for query in queries)
+    assert sorted(order.order_id for order in session.query(Order).filter(Order.delivery_id == 1)) == [1, 3]
+    assert round(session.query(Courier).filter(Courier.courier_id == 1).first().sum_weight, 2) == 0.24
+
+
+def test_patch_unassigned_courier_keeps_sum_weight(client):
+    rv = client.patch('/couriers/2', json={"regions": [1, 12], "working_hours": ["10:00-12:00"]})
+    session = db_session.create_session()
+
+    assert rv.status_code == 200
+    assert session.query(Courier).filter(Courier.courier_id == 2).first().sum_weight == 0
+    assert session.query(Order).filter(Order.delivery_id != None).count() == 0
+
+
+def test_lower_carrying_drops_heaviest_orders(client):
+    add_assigned_orders(db_session.create_session(), 10, 5, 2)
+    session = db_session.create_session()
+    session.query(Order).filter(Order.order_id == 14).first().weight = 9.98
+    session.commit()
+    rv = client.patch('/couriers/2', json={"courier_type": "foot"})
+    session = db_session.create_session()
+
+    assert rv.status_code == 200
+    assert sorted(order.order_id for order in session.query(Order).filter(Order.delivery_id == 2)) == [10, 11, 12, 13]
+    assert round(session.query(Courier).filter(Courier.courier_id == 2).first().sum_weight, 2) == 0.04
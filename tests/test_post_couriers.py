@@ -281,3 +281,34 @@ def test_not_specified_fields(client):
     for courier_data in json['data']:
         courier = session.query(Courier).filter(Courier.courier_id == courier_data['courier_id']).first()
         assert courier is None
+
+
+def test_duplicate_courier_id_in_batch(client):
+    json = {"data": [
+        {
+            "courier_id": 1,
+            "courier_type": "foot",
+            "regions": [1, 12, 22],
+            "working_hours": ["11:35-14:05", "09:00-11:00"]
+        },
+        {
+            "courier_id": 1,
+            "courier_type": "bike",
+            "regions": [22],
+            "working_hours": ["09:00-18:00"]
+        },
+        {
+            "courier_id": 2,
+            "courier_type": "car",
+            "regions": [12, 22, 23, 33],
+            "working_hours": []
+        }
+    ]}
+    rv = client.post('/couriers', json=json)
+    session = db_session.create_session()
+
+    assert rv.status_code == 400
+    assert rv.data == b'{"validation_error":{"couriers":[{"id":1}]}}\n'
+    for courier_data in json['data']:
+        courier = session.query(Courier).filter(Courier.courier_id == courier_data['courier_id']).first()
+        assert courier is None
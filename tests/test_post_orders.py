@@ -283,3 +283,34 @@ def test_not_specified_fields(client):
     for order_data in json['data']:
         order = session.query(Order).filter(Order.order_id == order_data['order_id']).first()
         assert order is None
+
+
+def test_duplicate_order_id_in_batch(client):
+    json = {"data": [
+        {
+            "order_id": 1,
+            "weight": 0.23,
+            "region": 12,
+            "delivery_hours": ["09:00-18:00"]
+        },
+        {
+            "order_id": 2,
+            "weight": 15,
+            "region": 1,
+            "delivery_hours": ["09:00-18:00"]
+        },
+        {
+            "order_id": 1,
+            "weight": 0.01,
+            "region": 22,
+            "delivery_hours": ["09:00-12:00", "16:00-21:30"]
+        }
+    ]}
+    rv = client.post('/orders', json=json)
+    session = db_session.create_session()
+
+    assert rv.status_code == 400
+    assert rv.data == b'{"validation_error":{"orders":[{"id":1}]}}\n'
+    for order_data in json['data']:
+        order = session.query(Order).filter(Order.order_id == order_data['order_id']).first()
+        assert order is None
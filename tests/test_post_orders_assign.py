@@ -1,4 +1,5 @@
-from tests.database_functions import reset_db, add_types, add_orders, add_couriers
+from tests.database_functions import reset_db, add_types, add_orders, add_couriers, count_queries
+from resources.order_index import order_index
 from datetime import datetime
 from data.orders import Order
 from data import db_session
@@ -108,3 +109,35 @@ def test_not_specified_field(client):
 
     assert rv.status_code == 400
     assert rv.data == b'{"message": "The browser (or proxy) sent a request that this server could not understand."}\n'
+
+
+def test_assign_orders_added_after_index_load(client):
+    client.post('/orders/assign', json={"courier_id": 3})
+    client.post('/orders', json={"data": [{"order_id": 4, "weight": 20, "region": 33,
+                                           "delivery_hours": ["09:00-18:00"]}]})
+    rv = client.post('/orders/assign', json={"courier_id": 3})
+    rv_dict = loads(rv.data)
+
+    assert rv.status_code == 200
+    assert rv_dict['orders'] == []
+    rv = client.patch('/couriers/3', json={"working_hours": ["10:00-12:00"]})
+    rv = client.post('/orders/assign', json={"courier_id": 3})
+    rv_dict = loads(rv.data)
+
+    assert rv.status_code == 200
+    assert 'assign_time' in rv_dict and rv_dict['orders'] == [{'id': 3}, {'id': 1}, {'id': 4}]
+
+
+def test_queries_do_not_depend_on_orders_count(client):
+    engine = db_session.global_init('./db/test_base.db')
+    with count_queries(engine) as small_queries:
+        client.post('/orders/assign', json={"courier_id": 1})
+    client.post('/orders', json={"data": [{"order_id": order_id, "weight": 0.01, "region": 33,
+                                           "delivery_hours": ["09:00-18:00"]} for order_id in range(10, 510)]})
+    order_index.reset()
+    with count_queries(engine) as large_queries:
+        rv = client.post('/orders/assign', json={"courier_id": 2})
+    rv_dict = loads(rv.data)
+
+    assert rv.status_code == 200 and rv_dict['orders'] == [{'id': 2}]
+    assert len(small_queries) == len(large_queries)
@@ -0,0 +1,69 @@
+from tests.database_functions import reset_db, add_types, add_orders, add_couriers
+from data.couriers import Courier
+from data.orders import Order
+from data import db_session
+from os.path import exists
+from json import loads
+from os import mkdir
+from app import app
+import pytest
+
+
+@pytest.fixture()
+def client():
+    if not exists('./db'):
+        mkdir('./db')
+    engine = db_session.global_init('./db/test_base.db')
+    app.config['TESTING'] = True
+    add_types(db_session.create_session())
+    add_orders(db_session.create_session())
+    add_couriers(db_session.create_session())
+    with app.test_client() as client:
+        yield client
+    reset_db(engine)
+
+
+def test_success_batch_assign(client):
+    rv = client.post('/orders/assign/batch', json={})
+    rv_dict = loads(rv.data)
+    session = db_session.create_session()
+
+    assert rv.status_code == 200
+    assert [(courier['id'], courier['orders']) for courier in rv_dict['couriers']] == \
+        [(1, [{'id': 3}, {'id': 1}]), (2, [{'id': 2}])]
+    assert all('assign_time' in courier for courier in rv_dict['couriers'])
+    assert sorted(order.order_id for order in session.query(Order).filter(Order.delivery_id == 1)) == [1, 3]
+    assert [order.order_id for order in session.query(Order).filter(Order.delivery_id == 2)] == [2]
+    assert session.query(Courier).filter(Courier.courier_id == 2).first().sum_weight == 12
+    assert str(session.query(Order).filter(Order.order_id == 2).first().delivery_orm) == \
+        rv_dict['couriers'][1]['assign_time']
+
+
+def test_batch_assign_matches_single_assign(client):
+    rv = client.post('/orders/assign/batch', json={'courier_ids': [2]})
+    rv_dict = loads(rv.data)
+
+    assert rv.status_code == 200
+    assert [(courier['id'], courier['orders']) for courier in rv_dict['couriers']] == [(2, [{'id': 2}])]
+    rv = client.post('/orders/assign', json={'courier_id': 2})
+    assert rv.status_code == 200 and loads(rv.data)['orders'] == [{'id': 2}]
+    rv = client.post('/orders/assign', json={'courier_id': 1})
+    assert rv.status_code == 200 and loads(rv.data)['orders'] == [{'id': 3}, {'id': 1}]
+
+
+def test_batch_assign_skips_busy_couriers(client):
+    client.post('/orders/assign', json={'courier_id': 1})
+    rv = client.post('/orders/assign/batch', json={'courier_ids': [1, 2, 3]})
+    rv_dict = loads(rv.data)
+
+    assert rv.status_code == 200
+    assert [(courier['id'], courier['orders']) for courier in rv_dict['couriers']] == [(2, [{'id': 2}])]
+
+
+def test_wrong_courier_ids(client):
+    for json in ({'courier_ids': [1, 4]}, {'courier_ids': '1'}, {'courier_id': 1}):
+        rv = client.post('/orders/assign/batch', json=json)
+
+        assert rv.status_code == 400
+        assert rv.data == b'{"message": "The browser (or proxy) sent a request that this server could not ' \
+                          b'understand."}\n'
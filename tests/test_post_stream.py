@@ -0,0 +1,81 @@
+from tests.database_functions import reset_db, add_types
+from data.couriers import Courier
+from data.orders import Order
+from data import db_session
+from os.path import exists
+from json import loads, dumps
+from os import mkdir
+from app import app
+import pytest
+
+
+@pytest.fixture()
+def client():
+    if not exists('./db'):
+        mkdir('./db')
+    engine = db_session.global_init('./db/test_base.db')
+    app.config['TESTING'] = True
+    add_types(db_session.create_session())
+    with app.test_client() as client:
+        yield client
+    reset_db(engine)
+
+
+def ndjson(items):
+    return '\n'.join(item if isinstance(item, str) else dumps(item) for item in items) + '\n'
+
+
+def results(rv):
+    return [loads(line) for line in rv.data.decode().splitlines()]
+
+
+def test_stream_orders_in_chunks(client):
+    orders = [{'order_id': id, 'weight': 1, 'region': 1, 'delivery_hours': ['09:00-18:00']} for id in range(1, 6)]
+    rv = client.post('/orders/stream?chunk_size=2', data=ndjson(orders))
+    session = db_session.create_session()
+
+    assert rv.status_code == 200 and rv.mimetype == 'application/x-ndjson'
+    assert [[order['id'] for order in chunk['accepted']] for chunk in results(rv)] == [[1, 2], [3, 4], [5]]
+    assert sorted(id for id, in session.query(Order.order_id)) == [1, 2, 3, 4, 5]
+    assert session.query(Order).filter(Order.order_id == 3).first().delivery_bitmap
+
+
+def test_stream_orders_rejects(client):
+    orders = [{'order_id': 1, 'weight': 1, 'region': 1, 'delivery_hours': []},
+              {'order_id': 2, 'weight': 100, 'region': 1, 'delivery_hours': []},
+              'not json',
+              {'order_id': 1, 'weight': 1, 'region': 1, 'delivery_hours': []},
+              {'order_id': 3, 'weight': 1, 'region': 1}]
+    rv = client.post('/orders/stream?chunk_size=3', data=ndjson(orders))
+
+    assert results(rv) == [{'chunk': 1, 'accepted': [{'id': 1}], 'rejected': [{'id': 2}, {'line': 3}]},
+                           {'chunk': 2, 'accepted': [], 'rejected': [{'id': 1}, {'id': 3}]}]
+    assert db_session.create_session().query(Order).count() == 1
+
+
+def test_stream_couriers(client):
+    couriers = [{'courier_id': 1, 'courier_type': 'foot', 'regions': [1, 2], 'working_hours': ['09:00-11:00']},
+                {'courier_id': 2, 'courier_type': 'plane', 'regions': [1], 'working_hours': []}]
+    rv = client.post('/couriers/stream', data=ndjson(couriers))
+    courier = db_session.create_session().query(Courier).filter(Courier.courier_id == 1).first()
+
+    assert results(rv) == [{'chunk': 1, 'accepted': [{'id': 1}], 'rejected': [{'id': 2}]}]
+    assert [region.number_region for region in courier.regions_orm] == [1, 2]
+    assert client.get('/couriers/1').json['working_hours'] == ['09:00-11:00']
+
+
+def test_stream_orders_are_assignable(client):
+    client.post('/couriers/stream', data=ndjson([
+        {'courier_id': 1, 'courier_type': 'foot', 'regions': [1], 'working_hours': ['09:00-18:00']}]))
+    client.post('/orders/assign', json={'courier_id': 1})
+    client.post('/orders/stream', data=ndjson([
+        {'order_id': 1, 'weight': 1, 'region': 1, 'delivery_hours': ['10:00-11:00']}]))
+    rv = client.post('/orders/assign', json={'courier_id': 1})
+
+    assert rv.json['orders'] == [{'id': 1}]
+
+
+def test_wrong_chunk_size(client):
+    rv = client.post('/orders/stream?chunk_size=0', data='')
+
+    assert rv.status_code == 400
@@ -0,0 +1,118 @@
+from tests.database_functions import reset_db, add_types, add_orders, add_couriers, query_budget
+from benchmarks.generator import Generator
+from datetime import datetime
+from data import db_session
+from os.path import exists
+from os import mkdir
+from app import app
+import pytest
+import json
+
+LARGE_ORDERS = 2000
+BUDGETS = {
+    'POST /couriers': 6,
+    'POST /orders': 6,
+    'POST /couriers/stream': 6,
+    'POST /orders/stream': 6,
+    'POST /orders/assign': 11,
+    'POST /orders/assign existing': 2,
+    'POST /orders/assign/batch': 12,
+    'POST /orders/assign/batch many': 12,
+    'POST /orders/complete': 14,
+    'PATCH /couriers/<id>': 18,
+    'GET /couriers/<id>': 3,
+    'GET /stats/db': 0,
+    'GET /stats/cache': 0,
+    'GET /metrics': 0,
+}
+
+
+def add_large_dataset(client):
+    generator = Generator(LARGE_ORDERS, seed=1)
+    client.post('/couriers', json={'data': list(generator.couriers(first_id=4))})
+    client.post('/orders', json={'data': list(generator.orders(first_id=4))})
+
+
+@pytest.fixture(params=['small', 'large'])
+def client(request):
+    if not exists('./db'):
+        mkdir('./db')
+    engine = db_session.global_init('./db/test_base.db')
+    app.config['TESTING'] = True
+    add_types(db_session.create_session())
+    add_orders(db_session.create_session())
+    add_couriers(db_session.create_session())
+    with app.test_client() as client:
+        if request.param == 'large':
+            add_large_dataset(client)
+        yield client
+    reset_db(engine)
+
+
+def new_couriers(count=10):
+    return list(Generator(10, seed=2).couriers(first_id=100000, count=count))
+
+
+def new_orders(count=10):
+    return list(Generator(10, seed=2).orders(first_id=100000, count=count))
+
+
+def ndjson(items):
+    return ''.join(json.dumps(item) + '\n' for item in items)
+
+
+def assigned_courier(client):
+    client.post('/orders/assign', json={'courier_id': 3})
+    for courier_id in (1, 2):
+        orders = client.post('/orders/assign', json={'courier_id': courier_id}).json['orders']
+        if orders:
+            return courier_id, orders[0]['id']
+
+
+def complete_time():
+    return datetime.now().strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+CASES = {
+    'POST /couriers': (lambda client: None, lambda client, _: client.post('/couriers', json={'data': new_couriers()})),
+    'POST /orders': (lambda client: None, lambda client, _: client.post('/orders', json={'data': new_orders()})),
+    'POST /couriers/stream': (lambda client: None,
+                              lambda client, _: client.post('/couriers/stream', data=ndjson(new_couriers()))),
+    'POST /orders/stream': (lambda client: None,
+                            lambda client, _: client.post('/orders/stream', data=ndjson(new_orders()))),
+    'POST /orders/assign': (lambda client: client.post('/orders/assign', json={'courier_id': 3}),
+                            lambda client, _: client.post('/orders/assign', json={'courier_id': 1})),
+    'POST /orders/assign existing': (lambda client: client.post('/orders/assign', json={'courier_id': 1}),
+                                     lambda client, _: client.post('/orders/assign', json={'courier_id': 1})),
+    'POST /orders/assign/batch': (lambda client: client.post('/orders/assign', json={'courier_id': 3}),
+                                  lambda client, _: client.post('/orders/assign/batch', json={'courier_ids': [1, 2]})),
+    'POST /orders/assign/batch many': (
+        lambda client: client.post('/couriers', json={'data': new_couriers(50)}).json['couriers'],
+        lambda client, couriers: client.post('/orders/assign/batch', json={
+            'courier_ids': [courier['id'] for courier in couriers]})),
+    'POST /orders/complete': (assigned_courier, lambda client, ids: client.post('/orders/complete', json={
+        'courier_id': ids[0], 'order_id': ids[1], 'complete_time': complete_time()})),
+    'PATCH /couriers/<id>': (assigned_courier, lambda client, ids: client.patch(
+        f'/couriers/{ids[0]}', json={'regions': [1], 'working_hours': ['10:00-11:00']})),
+    'GET /couriers/<id>': (lambda client: None, lambda client, _: client.get('/couriers/1')),
+    'GET /stats/db': (lambda client: None, lambda client, _: client.get('/stats/db')),
+    'GET /stats/cache': (lambda client: None, lambda client, _: client.get('/stats/cache')),
+    'GET /metrics': (lambda client: None, lambda client, _: client.get('/metrics')),
+}
+
+
+def test_every_endpoint_has_budget():
+    assert set(BUDGETS) == set(CASES)
+    assert {rule.rule for rule in app.url_map.iter_rules() if rule.endpoint != 'static'} == \
+        {endpoint.split()[1].replace('<id>', '<string:courier_id>') for endpoint in CASES}
+
+
+@pytest.mark.parametrize('endpoint', list(CASES))
+def test_query_budget(client, endpoint):
+    setup, request = CASES[endpoint]
+    context = setup(client)
+    with query_budget(BUDGETS[endpoint], db_session.get_engine(), db_session.get_engine(read_only=True)):
+        rv = request(client, context)
+        rv.get_data()
+
+    assert rv.status_code in (200, 201)
@@ -0,0 +1,50 @@
+from resources.serializers import ids_response, courier_profile, assign_result, batch_assign_result, dumps, \
+    validation_error_response, STREAM_THRESHOLD
+from resources import serializers
+from datetime import datetime
+from flask import jsonify
+from app import app
+import pytest
+
+
+def test_ids_match_jsonify():
+    with app.app_context():
+        assert ids_response('orders', [1, 2, 3], 201).get_data() == \
+            jsonify({'orders': [{'id': id} for id in [1, 2, 3]]}).get_data()
+        assert ids_response('orders', []).get_data() == b'{"orders":[]}\n'
+
+
+def test_validation_error_reports_each_id_once():
+    with app.app_context():
+        rv = validation_error_response('couriers', [1, 'kek', 1, [2], True, [2], 'kek'])
+
+    assert rv.get_data() == b'{"validation_error":{"couriers":[{"id":1},{"id":"kek"},{"id":[2]},{"id":true}]}}\n'
+
+
+def test_large_ids_are_streamed():
+    ids = list(range(STREAM_THRESHOLD + 1))
+    response = ids_response('couriers', ids, 201)
+
+    assert response.is_streamed and response.status_code == 201
+    assert response.get_data() == b'{"couriers":[%s]}\n' % b','.join(b'{"id":%d}' % id for id in ids)
+
+
+def test_shapes_match_jsonify():
+    assign_time = datetime(2021, 3, 28, 10, 5, 1, 123)
+    with app.app_context():
+        assert courier_profile(1, 'foot', [1, 12], [(540, 660)], 1000, 4.5) == jsonify(
+            {'courier_id': 1, 'courier_type': 'foot', 'earnings': 1000, 'rating': 4.5, 'regions': [1, 12],
+             'working_hours': ['09:00-11:00']}).get_data()
+        assert assign_result([3, 1], assign_time) == jsonify(
+            {'orders': [{'id': 3}, {'id': 1}], 'assign_time': '2021-03-28T10:05:01.000123Z'}).get_data()
+        assert batch_assign_result([(1, [3]), (2, [2])], assign_time) == jsonify({'couriers': [
+            {'id': id, 'orders': [{'id': order_id}], 'assign_time': '2021-03-28T10:05:01.000123Z'}
+            for id, order_id in [(1, 3), (2, 2)]]}).get_data()
+
+
+@pytest.mark.parametrize('encoder', [serializers.orjson, None])
+def test_dumps_without_orjson(monkeypatch, encoder):
+    monkeypatch.setattr(serializers, 'orjson', encoder)
+
+    assert dumps({'validation_error': {'orders': [{'id': '1'}, {'id': 0.5}]}}) == \
+        b'{"validation_error":{"orders":[{"id":"1"},{"id":0.5}]}}\n'